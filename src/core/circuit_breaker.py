@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_CONFIG = {
+    "window_size": 20,
+    "minimum_calls": 10,
+    "failure_rate_threshold": 0.5,
+    "slow_call_seconds": 5.0,
+    "slow_call_rate_threshold": 0.5,
+    "open_seconds": 30.0,
+    "half_open_max_calls": 1,
+}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a remote host is failing or slow
+
+    Outcomes of the last `window_size` calls are kept in memory. Once at
+    least `minimum_calls` were made and the failure or slow call rate
+    reaches its threshold, the circuit opens and calls raise
+    CircuitOpenError without touching the network. After `open_seconds`
+    up to `half_open_max_calls` probes are let through: a successful probe
+    closes the circuit, a failed one opens it again.
+    """
+
+    def __init__(self, name, **config):
+        self.name = name
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.state = CLOSED
+        self.opened_at = None
+        self.calls = deque(maxlen=self.config["window_size"])
+        self.half_open_calls = 0
+        self.rejected_total = 0
+        self._lock = threading.Lock()
+
+    def call(self, func, *args, is_failure=None, **kwargs):
+        """
+        Run func through the breaker
+
+        Exceptions count as failures, so do results for which `is_failure`
+        returns True. The result or exception is passed through unchanged.
+        """
+        self.before_call()
+
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+
+        failed = bool(is_failure and is_failure(result))
+        self.record(not failed, time.monotonic() - started)
+        return result
+
+    def before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                retry_after = self.opened_at + self.config["open_seconds"]
+                retry_after -= time.monotonic()
+                if retry_after > 0:
+                    self.rejected_total += 1
+                    raise CircuitOpenError(self.name, retry_after)
+
+                self.state = HALF_OPEN
+                self.half_open_calls = 0
+
+            if self.state == HALF_OPEN:
+                if self.half_open_calls >= self.config["half_open_max_calls"]:
+                    self.rejected_total += 1
+                    raise CircuitOpenError(self.name, self.config["open_seconds"])
+                self.half_open_calls += 1
+
+    def record(self, success, duration):
+        slow = duration >= self.config["slow_call_seconds"]
+
+        with self._lock:
+            if self.state == OPEN:
+                # Call started before the circuit opened
+                return
+
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self._close()
+                else:
+                    self._open()
+                return
+
+            self.calls.append((not success, slow))
+            if self._should_open():
+                self._open()
+
+    def snapshot(self):
+        with self._lock:
+            calls = len(self.calls)
+            return {
+                "name": self.name,
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": self._rate(0),
+                "slow_call_rate": self._rate(1),
+                "rejected_total": self.rejected_total,
+                "open_for_seconds": (
+                    round(time.monotonic() - self.opened_at, 1)
+                    if self.state != CLOSED
+                    else None
+                ),
+            }
+
+    def _should_open(self):
+        if len(self.calls) < self.config["minimum_calls"]:
+            return False
+        return (
+            self._rate(0) >= self.config["failure_rate_threshold"]
+            or self._rate(1) >= self.config["slow_call_rate_threshold"]
+        )
+
+    def _rate(self, index):
+        if not self.calls:
+            return 0.0
+        return round(sum(call[index] for call in self.calls) / len(self.calls), 3)
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.calls.clear()
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.calls.clear()
+
+
+def get_circuit_breaker(host):
+    """
+    Process-wide breaker of a host
+
+    Configured by CIRCUIT_BREAKER_DEFAULTS and per host overrides in
+    CIRCUIT_BREAKER_HOSTS.
+    """
+    breaker = _breakers.get(host)
+    if breaker is not None:
+        return breaker
+
+    with _breakers_lock:
+        if host not in _breakers:
+            config = {
+                **getattr(settings, "CIRCUIT_BREAKER_DEFAULTS", {}),
+                **getattr(settings, "CIRCUIT_BREAKER_HOSTS", {}).get(host, {}),
+            }
+            _breakers[host] = CircuitBreaker(host, **config)
+        return _breakers[host]
+
+
+def get_circuit_breaker_for_url(url):
+    return get_circuit_breaker(urlparse(url).netloc)
+
+
+def get_circuit_breakers():
+    return [breaker for _, breaker in sorted(_breakers.items())]
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch(
+            "src.core.circuit_breaker.time.monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(
+            "api.example.com",
+            window_size=4,
+            minimum_calls=4,
+            failure_rate_threshold=0.5,
+            open_seconds=30,
+        )
+
+    def _fail(self, times):
+        for _ in range(times):
+            self.breaker.before_call()
+            self.breaker.record(False, 0.1)
+
+    def test_stays_closed_below_minimum_calls(self):
+        self._fail(3)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_opens_at_failure_rate_and_rejects_calls(self):
+        self.breaker.record(True, 0.1)
+        self.breaker.record(True, 0.1)
+        self._fail(2)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.retry_after, 30)
+        self.assertEqual(self.breaker.snapshot()["rejected_total"], 1)
+
+    def test_slow_calls_open_the_circuit(self):
+        for _ in range(4):
+            self.breaker.record(True, 10.0)
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_after_open_seconds_allows_one_probe(self):
+        self._fail(4)
+        self.now += 30
+
+        self.breaker.before_call()
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_successful_probe_closes(self):
+        self._fail(4)
+        self.now += 30
+
+        self.breaker.before_call()
+        self.breaker.record(True, 0.1)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.snapshot()["calls"], 0)
+        self.breaker.before_call()
+
+    def test_failed_probe_opens_again(self):
+        self._fail(4)
+        self.now += 30
+
+        self.breaker.before_call()
+        self.breaker.record(False, 0.1)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now += 29
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_call_passes_results_and_exceptions_through(self):
+        self.assertEqual(self.breaker.call(lambda: 42), 42)
+        with self.assertRaises(ValueError):
+            self.breaker.call(mock.Mock(side_effect=ValueError))
+        self.breaker.call(lambda: 500, is_failure=lambda status: status >= 500)
+
+        self.assertEqual(self.breaker.snapshot()["failure_rate"], 0.667)
@@ -10,11 +10,20 @@ class PlaceAdmin(admin.ModelAdmin):
 
 
 class EventAdmin(admin.ModelAdmin):
-    list_display = ["name", "event_date", "status", "place", "created_at"]
+    list_display = [
+        "name",
+        "event_date",
+        "status",
+        "place",
+        "registrations_count",
+        "capacity",
+        "created_at",
+    ]
     list_filter = ["status", "event_date", "place"]
     search_fields = ["name"]
     date_hierarchy = "event_date"
     raw_id_fields = ["place"]
+    readonly_fields = ["registrations_count"]
 
 
 admin.site.register(Place, PlaceAdmin)
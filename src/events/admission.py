@@ -0,0 +1,165 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .cache import get_event_version
+
+CLOSED_KEY = "events:registration_closed:{event_id}:{version}"
+LIMIT_KEY = "events:admission:{scope}:{ident}:{window}"
+
+
+class FixedWindowLimiter:
+    """
+    Allow `capacity` requests per fixed window of `period` seconds
+
+    A fixed-window counter, not a token bucket: the count resets at every
+    window boundary, so up to twice the capacity can pass around one.
+    A token bucket has to read, refill and write its state in one step,
+    which Django's cache API cannot do atomically across processes; `add`
+    and `incr` can, so a fixed window is the shared limit we can enforce
+    exactly. Requests are counted with atomic cache `incr`, so the limit is
+    shared by every process using the same cache (Redis, Memcached);
+    LocMemCache limits a single process, which is enough for tests.
+    """
+
+    def __init__(self, scope, capacity, period):
+        self.scope = scope
+        self.capacity = capacity
+        self.period = period
+
+    def consume(self, ident):
+        """
+        Count one request, return None or seconds until the window ends
+        """
+        now = time.time()
+        window = int(now // self.period)
+        key = LIMIT_KEY.format(scope=self.scope, ident=ident, window=window)
+
+        cache.add(key, 0, timeout=self.period + 1)
+        try:
+            taken = cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr, let the request through
+            return None
+
+        if taken <= self.capacity:
+            return None
+        return max(1, math.ceil((window + 1) * self.period - now))
+
+
+def get_limiter(scope, setting, default):
+    rate = getattr(settings, setting, default)
+    if rate is None:
+        return None
+
+    capacity, period = rate
+    return FixedWindowLimiter(scope, capacity, period)
+
+
+def get_token_user_id(request):
+    """
+    User id claim of a valid JWT access token, None without one
+
+    The token is only verified, the user is not loaded, so rejected
+    requests never reach the database. Malformed headers count as no
+    token: this runs outside DRF, whose exception handler would otherwise
+    turn AuthenticationFailed into a 401.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if not header:
+        return None
+
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+def _get_closed_key(event_id):
+    # Keyed with the event cache version: an update that reopens the event
+    # or raises its capacity bumps the version and drops the flag.
+    version = get_event_version(event_id)
+    return CLOSED_KEY.format(event_id=event_id, version=version)
+
+
+def close_admission(event_id, error):
+    """
+    Remember that registrations for the event are rejected with `error`
+    """
+    cache.set(
+        _get_closed_key(event_id),
+        (error.field, str(error), error.status_code),
+        timeout=getattr(settings, "EVENTS_REGISTRATION_CLOSED_CACHE_TIMEOUT", 60),
+    )
+
+
+def _not_authenticated(request):
+    response = JsonResponse(
+        {"detail": "Authentication credentials were not provided or are invalid"},
+        status=401,
+    )
+    response["WWW-Authenticate"] = JWTAuthentication().authenticate_header(request)
+    return response
+
+
+def too_many_requests(retry_after, message="Too many registration requests"):
+    response = JsonResponse({"error": f"{message}, try again later"}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def registration_admission(view_func):
+    """
+    Reject unauthenticated requests, registrations for closed or sold out
+    events and excess load before the view touches the database
+
+    The access token is verified first, so anonymous requests never use up
+    the limits of real users. Clients are limited by user id, not address,
+    so users behind one NAT do not share a limit. Must wrap the DRF view
+    from the outside.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, event_id, *args, **kwargs):
+        user_id = get_token_user_id(request)
+        if user_id is None:
+            return _not_authenticated(request)
+
+        closed = cache.get(_get_closed_key(event_id))
+        if closed is not None:
+            field, message, status_code = closed
+            return JsonResponse({"errors": {field: [message]}}, status=status_code)
+
+        limiters = [
+            (
+                get_limiter("client", "EVENTS_REGISTRATION_CLIENT_RATE", (10, 60)),
+                user_id,
+            ),
+            (
+                get_limiter("event", "EVENTS_REGISTRATION_EVENT_RATE", (500, 1)),
+                event_id,
+            ),
+        ]
+        for limiter, ident in limiters:
+            if limiter is None:
+                continue
+
+            retry_after = limiter.consume(ident)
+            if retry_after is not None:
+                return too_many_requests(retry_after)
+
+        return view_func(request, event_id, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,179 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+
+from .auth_app.authentication import AsyncJWTAuthentication
+from .cache import (
+    aget_event_detail_cache_key,
+    aget_event_list_cache_key,
+    aget_events_version,
+    get_cache_timeout,
+)
+from .conditional import (
+    LIST_VALIDATOR_AGGREGATES,
+    get_event_list_validator_queryset,
+    make_event_detail_validator,
+    make_event_list_validator,
+)
+from .filters import apply_event_filters
+from .models import Event
+from .pagination import EventCursorPaginator
+from .projections import (
+    CURSOR_COLUMNS,
+    EVENT_DETAIL_FIELDS,
+    EVENT_LIST_FIELDS,
+    get_projection_queryset,
+    project_event,
+    project_events,
+)
+from .serializers import EventFieldsQuerySerializer, EventListQuerySerializer
+
+
+def _render(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+
+
+async def _authenticate(request):
+    """
+    Return error response if request has no valid Access Token
+    """
+    authenticator = AsyncJWTAuthentication()
+
+    try:
+        result = await authenticator.aauthenticate(request)
+    except APIException as e:
+        detail = (
+            e.detail if isinstance(e.detail, (list, dict)) else {"detail": e.detail}
+        )
+        response = _render(detail, e.status_code)
+    else:
+        if result is not None:
+            request.user, request.auth = result
+            return None
+        response = _render(
+            {"detail": "Authentication credentials were not provided."},
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    response["WWW-Authenticate"] = authenticator.authenticate_header(request)
+    return response
+
+
+def _conditional_response(request, etag, last_modified):
+    """
+    Return 304 response if the client copy is still valid
+    """
+    return get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def _set_validators(response, etag, last_modified):
+    if etag:
+        response["ETag"] = quote_etag(etag)
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+@require_GET
+async def event_list(request):
+    """
+    Async version of the protected events list with the same parameters
+    """
+    if error := await _authenticate(request):
+        return error
+
+    query = EventListQuerySerializer(data=request.GET)
+
+    if not query.is_valid():
+        return _render({"errors": query.errors}, status.HTTP_400_BAD_REQUEST)
+
+    params = query.validated_data
+    stats = await get_event_list_validator_queryset(params).aaggregate(
+        **LIST_VALIDATOR_AGGREGATES
+    )
+    etag, last_modified = make_event_list_validator(
+        request, await aget_events_version(), stats
+    )
+
+    if response := _conditional_response(request, etag, last_modified):
+        return _set_validators(response, etag, last_modified)
+
+    cache_key = await aget_event_list_cache_key(request.GET)
+    data = await cache.aget(cache_key)
+
+    if data is None:
+        fields = params.get("fields", EVENT_LIST_FIELDS)
+        events = apply_event_filters(Event.objects.all(), params)
+        paginator = EventCursorPaginator(page_size=params["page_size"])
+        rows = get_projection_queryset(events, fields, CURSOR_COLUMNS)
+        rows = paginator.get_page_queryset(rows, params.get("cursor"))
+        page, next_cursor = paginator.build_page([row async for row in rows])
+        page = project_events(page, fields)
+
+        data = {
+            "events": page,
+            "count": len(page),
+            "next_cursor": next_cursor,
+        }
+
+        if params["with_total"]:
+            total = await sync_to_async(paginator.get_total)(events)
+            data["total"], data["total_is_estimate"] = total
+
+        await cache.aset(cache_key, data, get_cache_timeout())
+
+    return _set_validators(_render(data), etag, last_modified)
+
+
+@require_GET
+async def event_detail(request, event_id):
+    """
+    Async version of the protected event details with the same parameters
+    """
+    if error := await _authenticate(request):
+        return error
+
+    query = EventFieldsQuerySerializer(data=request.GET)
+
+    if not query.is_valid():
+        return _render({"errors": query.errors}, status.HTTP_400_BAD_REQUEST)
+
+    events = Event.objects.filter(id=event_id)
+    updated_at = await events.values_list("updated_at", flat=True).afirst()
+
+    if updated_at is None:
+        return _render({"error": "Event not found"}, status.HTTP_404_NOT_FOUND)
+
+    etag, last_modified = make_event_detail_validator(request, event_id, updated_at)
+
+    if response := _conditional_response(request, etag, last_modified):
+        return _set_validators(response, etag, last_modified)
+
+    fields = query.validated_data.get("fields", EVENT_DETAIL_FIELDS)
+    cache_key = await aget_event_detail_cache_key(event_id, fields)
+    data = await cache.aget(cache_key)
+
+    if data is None:
+        row = await get_projection_queryset(events, fields).afirst()
+
+        if row is None:
+            return _render({"error": "Event not found"}, status.HTTP_404_NOT_FOUND)
+
+        data = {"event": project_event(row, fields)}
+        await cache.aset(cache_key, data, get_cache_timeout())
+
+    return _set_validators(_render(data), etag, last_modified)
@@ -0,0 +1,147 @@
+import logging
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from src.sync.outbox_services import OutboxService
+
+from .cache import invalidate_events
+from .models import Event, Place
+from .serializers import EventSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class EventBulkService:
+    """
+    Service for creating and updating many events in one transaction
+
+    Items with `id` update existing events, the rest are created. Invalid
+    items are reported by index and skipped, valid ones are written with a
+    fixed number of queries regardless of the batch size.
+    """
+
+    batch_size = 500
+
+    def __init__(self):
+        self.outbox = OutboxService()
+
+    def apply(self, items):
+        errors = {}
+        creates = []
+        updates = {}
+
+        for index, item in enumerate(items):
+            event_id, data, item_errors = self._validate_item(item)
+
+            if item_errors:
+                errors[index] = item_errors
+            elif event_id is None:
+                creates.append((index, data))
+            elif event_id in updates:
+                errors[index] = {"id": ["Duplicate event id in request"]}
+            else:
+                updates[event_id] = (index, data)
+
+        places = self._get_places(
+            [data for _, data in creates + list(updates.values())]
+        )
+        events = Event.objects.select_related("place").in_bulk(list(updates))
+
+        new_events = []
+        for index, data in creates:
+            place, place_error = self._resolve_place(data, places)
+            if place_error:
+                errors[index] = place_error
+                continue
+            new_events.append(Event(place=place, **data))
+
+        changed_events = []
+        changed_fields = {"updated_at"}
+        now = timezone.now()
+        for event_id, (index, data) in updates.items():
+            event = events.get(event_id)
+            if event is None:
+                errors[index] = {"id": ["Event not found"]}
+                continue
+
+            if "place_id" in data:
+                place, place_error = self._resolve_place(data, places)
+                if place_error:
+                    errors[index] = place_error
+                    continue
+                event.place = place
+                changed_fields.add("place")
+
+            for field, value in data.items():
+                setattr(event, field, value)
+                changed_fields.add(field)
+
+            # bulk_update() skips auto_now, conditional GET relies on it
+            event.updated_at = now
+            changed_events.append(event)
+
+        with transaction.atomic():
+            created = Event.objects.bulk_create(new_events, batch_size=self.batch_size)
+
+            if changed_events:
+                Event.objects.bulk_update(
+                    changed_events, sorted(changed_fields), batch_size=self.batch_size
+                )
+
+            if created or changed_events:
+                self.outbox.create_event_messages(created, changed_events)
+                invalidate_events([event.id for event in changed_events])
+
+        logger.info(
+            "Bulk events applied - Created: %s, Updated: %s, Errors: %s",
+            len(created),
+            len(changed_events),
+            len(errors),
+        )
+
+        return {
+            "created": [str(event.id) for event in created],
+            "updated": [str(event.id) for event in changed_events],
+            "errors": [
+                {"index": index, "errors": errors[index]} for index in sorted(errors)
+            ],
+        }
+
+    def _validate_item(self, item):
+        """
+        Return (event_id, validated_data, errors) of a single item
+        """
+        if not isinstance(item, dict):
+            return None, None, {"non_field_errors": ["Expected an object"]}
+
+        event_id = item.get("id")
+        if event_id is not None:
+            try:
+                event_id = uuid.UUID(str(event_id))
+            except ValueError:
+                return None, None, {"id": ["Must be a valid UUID."]}
+
+        serializer = EventSerializer(data=item, partial=event_id is not None)
+        if not serializer.is_valid():
+            return None, None, serializer.errors
+
+        return event_id, dict(serializer.validated_data), None
+
+    def _get_places(self, items):
+        place_ids = {data["place_id"] for data in items if data.get("place_id")}
+        return Place.objects.in_bulk(place_ids) if place_ids else {}
+
+    def _resolve_place(self, data, places):
+        """
+        Pop place_id from validated data and return (place, errors)
+        """
+        place_id = data.pop("place_id", None)
+        if place_id is None:
+            return None, None
+
+        place = places.get(place_id)
+        if place is None:
+            return None, {"place_id": ["Place not found"]}
+        return place, None
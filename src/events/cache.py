@@ -0,0 +1,132 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_VERSION_KEY = "events:version"
+EVENT_VERSION_KEY = "events:version:{event_id}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+
+    if version is None:
+        # Start from the clock so a version lost on eviction never reuses
+        # a number that older cache entries were keyed with.
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+
+    return version
+
+
+async def _aget_version(key):
+    version = await cache.aget(key)
+
+    if version is None:
+        version = time.time_ns()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def get_cache_timeout():
+    return getattr(settings, "EVENTS_CACHE_TIMEOUT", 300)
+
+
+def get_events_version():
+    """
+    Current version of the event collection
+    """
+    return _get_version(GLOBAL_VERSION_KEY)
+
+
+async def aget_events_version():
+    return await _aget_version(GLOBAL_VERSION_KEY)
+
+
+def get_params_digest(query_params):
+    """
+    Stable digest of query params regardless of their order
+    """
+    params = sorted(
+        (key, value) for key, values in query_params.lists() for value in values
+    )
+    return hashlib.md5(repr(params).encode()).hexdigest()
+
+
+def get_event_list_cache_key(query_params):
+    """
+    Cache key of an event list page for given query params
+    """
+    digest = get_params_digest(query_params)
+    return f"events:list:{get_events_version()}:{digest}"
+
+
+async def aget_event_list_cache_key(query_params):
+    digest = get_params_digest(query_params)
+    return f"events:list:{await aget_events_version()}:{digest}"
+
+
+def get_event_version(event_id):
+    """
+    Current version of a single event
+    """
+    return _get_version(EVENT_VERSION_KEY.format(event_id=event_id))
+
+
+def get_event_detail_cache_key(event_id, fields):
+    """
+    Cache key of a single event representation with given fields
+    """
+    version = get_event_version(event_id)
+    return f"events:detail:{event_id}:{version}:{','.join(fields)}"
+
+
+async def aget_event_detail_cache_key(event_id, fields):
+    version = await _aget_version(EVENT_VERSION_KEY.format(event_id=event_id))
+    return f"events:detail:{event_id}:{version}:{','.join(fields)}"
+
+
+def invalidate_events(event_ids=()):
+    """
+    Invalidate cached event lists and given event details
+
+    Versions are bumped once the current transaction commits, so readers
+    never cache data the transaction has not made visible yet.
+    """
+    event_ids = list(event_ids)
+
+    def bump():
+        _bump_version(GLOBAL_VERSION_KEY)
+        for event_id in event_ids:
+            _bump_version(EVENT_VERSION_KEY.format(event_id=event_id))
+
+    transaction.on_commit(bump)
+
+
+def invalidate_event_details(event_ids):
+    """
+    Invalidate cached details of given events, leaving event lists cached
+
+    For changes of registration counters only: every registration would
+    otherwise drop all cached list pages. List pages show these counters
+    up to EVENTS_CACHE_TIMEOUT seconds stale.
+    """
+    event_ids = list(event_ids)
+
+    def bump():
+        for event_id in event_ids:
+            _bump_version(EVENT_VERSION_KEY.format(event_id=event_id))
+
+    transaction.on_commit(bump)
@@ -0,0 +1,106 @@
+import hashlib
+
+from django.db.models import Count, Max
+
+from .cache import get_events_version, get_params_digest
+from .filters import apply_event_filters
+from .models import Event
+from .pagination import EventCursorPaginator
+from .serializers import EventListQuerySerializer
+
+LIST_VALIDATOR_AGGREGATES = {
+    "last_modified": Max("updated_at"),
+    "count": Count("id"),
+}
+
+
+def _make_etag(*parts):
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def get_event_list_validator_queryset(params):
+    """
+    Page range of the requested event list, without rendered columns
+    """
+    events = apply_event_filters(Event.objects.all(), params)
+    paginator = EventCursorPaginator(page_size=params["page_size"])
+    return paginator.get_page_queryset(events, params.get("cursor"))
+
+
+def make_event_list_validator(request, version, stats):
+    """
+    Build (etag, last_modified) of an event list page from its aggregates
+    """
+    last_modified = stats["last_modified"]
+    etag = _make_etag(
+        version,
+        last_modified.isoformat() if last_modified else "",
+        stats["count"],
+        get_params_digest(request.GET),
+    )
+    return etag, last_modified
+
+
+def make_event_detail_validator(request, event_id, updated_at):
+    """
+    Build (etag, last_modified) of a single event from its updated_at
+    """
+    if updated_at is None:
+        return None, None
+
+    etag = _make_etag(event_id, updated_at.isoformat(), get_params_digest(request.GET))
+    return etag, updated_at
+
+
+def _get_event_list_validator(request):
+    """
+    Return (etag, last_modified) of the requested event list page
+
+    Computed with one aggregate over the page range scan and memoized on the
+    request, since both condition() callbacks need it.
+    """
+    if not hasattr(request, "_event_list_validator"):
+        validator = (None, None)
+        query = EventListQuerySerializer(data=request.GET)
+
+        if query.is_valid():
+            page = get_event_list_validator_queryset(query.validated_data)
+            stats = page.aggregate(**LIST_VALIDATOR_AGGREGATES)
+            validator = make_event_list_validator(request, get_events_version(), stats)
+
+        request._event_list_validator = validator
+
+    return request._event_list_validator
+
+
+def _get_event_detail_validator(request, event_id):
+    """
+    Return (etag, last_modified) of a single event from its updated_at
+    """
+    if not hasattr(request, "_event_detail_validator"):
+        updated_at = (
+            Event.objects.filter(id=event_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        request._event_detail_validator = make_event_detail_validator(
+            request, event_id, updated_at
+        )
+
+    return request._event_detail_validator
+
+
+def event_list_etag(request):
+    return _get_event_list_validator(request)[0]
+
+
+def event_list_last_modified(request):
+    return _get_event_list_validator(request)[1]
+
+
+def event_detail_etag(request, event_id):
+    return _get_event_detail_validator(request, event_id)[0]
+
+
+def event_detail_last_modified(request, event_id):
+    return _get_event_detail_validator(request, event_id)[1]
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from django.conf import settings
+
+from .projections import to_primitive
+
+EVENT_EXPORT_COLUMNS = {
+    "id": "id",
+    "name": "name",
+    "event_date": "event_date",
+    "status": "status",
+    "place_id": "place_id",
+    "place_name": "place__name",
+    "registrations_count": "registrations_count",
+    "capacity": "capacity",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+REGISTRATION_EXPORT_COLUMNS = {
+    "id": "id",
+    "full_name": "full_name",
+    "email": "email",
+    "is_confirmed": "is_confirmed",
+    "created_at": "created_at",
+}
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class Echo:
+    """
+    File-like object that hands written rows back to the csv writer caller
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_chunk_size():
+    return getattr(settings, "EVENTS_EXPORT_CHUNK_SIZE", 2000)
+
+
+def iter_rows(queryset, columns):
+    """
+    Stream rows as dicts from a server-side cursor without building models
+    """
+    names = list(columns)
+    rows = queryset.values_list(*columns.values()).iterator(
+        chunk_size=get_export_chunk_size()
+    )
+
+    for row in rows:
+        yield dict(zip(names, (to_primitive(value) for value in row)))
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def iter_csv(rows, columns):
+    writer = csv.writer(Echo())
+    names = list(columns)
+
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(
+            ["" if row[name] is None else row[name] for name in names]
+        )
+
+
+def stream_export(queryset, columns, output):
+    """
+    Return iterator of encoded export chunks in the requested format
+    """
+    rows = iter_rows(queryset, columns)
+
+    if output == "csv":
+        return iter_csv(rows, columns)
+    return iter_ndjson(rows)
@@ -0,0 +1,29 @@
+from django.utils import timezone
+
+
+def apply_event_filters(queryset, params):
+    """
+    Push event list filters down into the queryset
+
+    Status and date bounds are served by `event_status_date_idx`, place by
+    `event_place_date_idx`.
+    """
+    if params.get("status"):
+        queryset = queryset.filter(status=params["status"])
+
+    if params.get("place_id"):
+        queryset = queryset.filter(place_id=params["place_id"])
+
+    date_from = params.get("event_date__gte")
+
+    if params.get("upcoming"):
+        now = timezone.now()
+        date_from = max(date_from, now) if date_from else now
+
+    if date_from:
+        queryset = queryset.filter(event_date__gte=date_from)
+
+    if params.get("event_date__lte"):
+        queryset = queryset.filter(event_date__lte=params["event_date__lte"])
+
+    return queryset
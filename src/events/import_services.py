@@ -0,0 +1,248 @@
+import csv
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from rest_framework import serializers
+
+from src.sync.outbox_services import OutboxService
+
+from .cache import invalidate_event_details
+from .models import Event, EventRegistration, EventsStatus
+from .notification_service import NotificationService
+from .registration_services import (
+    CONFIRMATION_CODE_ATTEMPTS,
+    EventNotFound,
+    RegistrationClosed,
+    generate_confirmation_code,
+)
+from .serializers import EventRegistrationSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = ("full_name", "email")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class RegistrationImportService:
+    """
+    Service for importing event registrations from CSV attendee lists
+
+    The file is read row by row and written in fixed size chunks, each chunk
+    costs one lookup of already registered emails, one locking read of the
+    event, one bulk INSERT, one lookup of the rows it inserted, one counter
+    UPDATE and one outbox INSERT. Closed events are rejected and the event
+    capacity is enforced like for single registrations, rows beyond it are
+    counted as `sold_out`.
+    """
+
+    def __init__(self, chunk_size=None, send_confirmations=True):
+        self.chunk_size = chunk_size or getattr(
+            settings, "EVENTS_IMPORT_CHUNK_SIZE", 1000
+        )
+        self.max_reported_errors = getattr(
+            settings, "EVENTS_IMPORT_MAX_REPORTED_ERRORS", 100
+        )
+        self.send_confirmations = (
+            send_confirmations and NotificationService().is_configured()
+        )
+        self.outbox = OutboxService()
+
+    def import_csv(self, event_id, stream):
+        """
+        Import registrations from a text stream with full_name,email columns
+        """
+        self._check_open(
+            Event.objects.filter(id=event_id).values_list("status", flat=True).first()
+        )
+
+        reader = csv.DictReader(stream)
+        missing = [
+            name for name in IMPORT_COLUMNS if name not in (reader.fieldnames or [])
+        ]
+        if missing:
+            raise ImportFormatError(f"Missing CSV columns: {', '.join(missing)}")
+
+        summary = {
+            "inserted": 0,
+            "duplicates": 0,
+            "invalid": 0,
+            "sold_out": 0,
+            "errors": [],
+        }
+        rows = ((reader.line_num, row) for row in reader)
+
+        try:
+            while chunk := list(islice(rows, self.chunk_size)):
+                registrations = self._validate_chunk(event_id, chunk, summary)
+                self._insert_chunk(event_id, registrations, summary)
+        finally:
+            # Chunks committed before the event closed changed its counter
+            invalidate_event_details([event_id])
+
+        logger.info(
+            "Imported registrations for event %s - Inserted: %s, Duplicates: %s, "
+            "Invalid: %s, Sold out: %s",
+            event_id,
+            summary["inserted"],
+            summary["duplicates"],
+            summary["invalid"],
+            summary["sold_out"],
+        )
+        return summary
+
+    def _validate_chunk(self, event_id, chunk, summary):
+        """
+        Return registrations built from valid rows, one per email
+        """
+        registrations = {}
+        # One serializer validates the whole chunk, building its fields per
+        # row would cost several times more than the validation itself.
+        serializer = EventRegistrationSerializer()
+
+        for line, row in chunk:
+            try:
+                data = serializer.run_validation(
+                    {
+                        "event_id": event_id,
+                        "full_name": (row.get("full_name") or "").strip(),
+                        "email": (row.get("email") or "").strip(),
+                    }
+                )
+            except serializers.ValidationError as e:
+                self._add_error(summary, line, e.detail)
+                continue
+
+            email = data["email"]
+            if email in registrations:
+                summary["duplicates"] += 1
+                continue
+
+            registrations[email] = EventRegistration(
+                event_id=event_id,
+                full_name=data["full_name"],
+                email=email,
+                confirmation_code=generate_confirmation_code(),
+            )
+
+        return registrations
+
+    def _insert_chunk(self, event_id, registrations, summary):
+        if not registrations:
+            return
+
+        existing = set(
+            EventRegistration.objects.filter(
+                event_id=event_id, email__in=list(registrations)
+            ).values_list("email", flat=True)
+        )
+        new_registrations = [
+            registration
+            for email, registration in registrations.items()
+            if email not in existing
+        ]
+        summary["duplicates"] += len(existing)
+
+        if not new_registrations:
+            return
+
+        with transaction.atomic():
+            # The event row stays locked until the chunk commits, so
+            # concurrent registrations cannot take the seats counted here.
+            event = (
+                Event.objects.select_for_update()
+                .only("status", "capacity", "registrations_count")
+                .filter(id=event_id)
+                .first()
+            )
+            self._check_open(event and event.status)
+            if event.capacity is not None:
+                seats = max(event.capacity - event.registrations_count, 0)
+                summary["sold_out"] += max(len(new_registrations) - seats, 0)
+                new_registrations = new_registrations[:seats]
+                if not new_registrations:
+                    return
+
+            inserted, failed = self._bulk_insert(event_id, new_registrations)
+
+            if inserted:
+                Event.objects.filter(id=event_id).update(
+                    registrations_count=F("registrations_count") + len(inserted),
+                    updated_at=Now(),
+                )
+
+            if inserted and self.send_confirmations:
+                self.outbox.create_confirmation_email_messages(inserted)
+
+        summary["inserted"] += len(inserted)
+        summary["duplicates"] += len(new_registrations) - len(inserted) - len(failed)
+        for registration in failed:
+            self._add_error(
+                summary,
+                None,
+                {
+                    "email": [
+                        f"Could not generate a confirmation code for {registration.email}"
+                    ]
+                },
+            )
+
+    def _check_open(self, event_status):
+        if event_status is None:
+            raise EventNotFound("Event not found")
+        if event_status != EventsStatus.OPEN:
+            raise RegistrationClosed("Registration for this event closed")
+
+    def _bulk_insert(self, event_id, registrations):
+        """
+        INSERT registrations, return (inserted, failed)
+
+        ignore_conflicts keeps the chunk going if the same email was
+        registered between the lookup of existing emails and this INSERT,
+        or a confirmation code is already taken in the event. Ids are
+        generated client side, so the rows that made it in are found by id.
+        Rows that lost only their code get a new one and are tried again.
+        """
+        inserted = []
+
+        for _ in range(CONFIRMATION_CODE_ATTEMPTS):
+            EventRegistration.objects.bulk_create(
+                registrations,
+                batch_size=self.chunk_size,
+                ignore_conflicts=True,
+            )
+            inserted_ids = set(
+                EventRegistration.objects.filter(
+                    id__in=[registration.id for registration in registrations]
+                ).values_list("id", flat=True)
+            )
+            inserted += [r for r in registrations if r.id in inserted_ids]
+            dropped = [r for r in registrations if r.id not in inserted_ids]
+            if not dropped:
+                return inserted, []
+
+            registered = set(
+                EventRegistration.objects.filter(
+                    event_id=event_id, email__in=[r.email for r in dropped]
+                ).values_list("email", flat=True)
+            )
+            registrations = [r for r in dropped if r.email not in registered]
+            if not registrations:
+                return inserted, []
+
+            for registration in registrations:
+                registration.confirmation_code = generate_confirmation_code()
+
+        return inserted, registrations
+
+    def _add_error(self, summary, line, errors):
+        summary["invalid"] += 1
+        # Only the first errors are kept so memory stays flat on huge files
+        if len(summary["errors"]) < self.max_reported_errors:
+            summary["errors"].append({"line": line, "errors": errors})
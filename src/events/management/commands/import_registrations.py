@@ -0,0 +1,51 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.events.import_services import ImportFormatError, RegistrationImportService
+from src.events.registration_services import RegistrationError
+
+
+class Command(BaseCommand):
+    help = "Import event registrations from a CSV file with full_name,email"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "event_id", type=uuid.UUID, help="Event to register attendees for"
+        )
+        parser.add_argument("path", help="CSV file with full_name,email columns")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Rows written per bulk INSERT",
+        )
+        parser.add_argument(
+            "--no-confirmations",
+            action="store_true",
+            help="Do not queue confirmation emails",
+        )
+
+    def handle(self, *args, **options):
+        service = RegistrationImportService(
+            chunk_size=options["chunk_size"],
+            send_confirmations=not options["no_confirmations"],
+        )
+
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                summary = service.import_csv(options["event_id"], stream)
+        except (OSError, RegistrationError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for error in summary["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported registrations - Inserted: {summary['inserted']}, "
+                f"Duplicates: {summary['duplicates']}, "
+                f"Invalid: {summary['invalid']}, "
+                f"Sold out: {summary['sold_out']}"
+            )
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from src.events.registration_services import RegistrationService
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized event registration counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            action="append",
+            dest="events",
+            help="Reconcile only this event id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        fixed = RegistrationService().reconcile_counts(options["events"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled registration counters: {fixed} fixed")
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_registrations_count(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventRegistration = apps.get_model("events", "EventRegistration")
+
+    counts = (
+        EventRegistration.objects.filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Event.objects.update(registrations_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0005_fix_event_status_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Capacity"
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="registrations_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Registrations Count"
+            ),
+        ),
+        migrations.RunPython(backfill_registrations_count, migrations.RunPython.noop),
+    ]
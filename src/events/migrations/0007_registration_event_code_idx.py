@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0006_event_registrations_count_capacity"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="eventregistration",
+            name="events_even_confirm_8efdf8_idx",
+        ),
+        migrations.AddIndex(
+            model_name="eventregistration",
+            index=models.Index(
+                fields=["event", "confirmation_code"],
+                name="registration_event_code_idx",
+            ),
+        ),
+    ]
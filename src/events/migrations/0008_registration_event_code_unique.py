@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:26
+
+import secrets
+import string
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def regenerate_duplicate_codes(apps, schema_editor):
+    EventRegistration = apps.get_model("events", "EventRegistration")
+
+    duplicates = (
+        EventRegistration.objects.values("event_id", "confirmation_code")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        taken = set(
+            EventRegistration.objects.filter(
+                event_id=duplicate["event_id"]
+            ).values_list("confirmation_code", flat=True)
+        )
+        # The first registration keeps its code, the others get new ones
+        registrations = EventRegistration.objects.filter(
+            event_id=duplicate["event_id"],
+            confirmation_code=duplicate["confirmation_code"],
+        ).order_by("created_at")[1:]
+        for registration in registrations:
+            code = duplicate["confirmation_code"]
+            while code in taken:
+                code = "".join(
+                    secrets.choice(string.ascii_uppercase + string.digits)
+                    for _ in range(6)
+                )
+            taken.add(code)
+            registration.confirmation_code = code
+            registration.save(update_fields=["confirmation_code"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0007_registration_event_code_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="eventregistration",
+            constraint=models.UniqueConstraint(
+                fields=("event", "confirmation_code"),
+                name="registration_event_code_uniq",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="eventregistration",
+            name="registration_event_code_idx",
+        ),
+    ]
@@ -41,14 +41,29 @@ class Event(BaseModel):
         null=True,
         blank=True,
     )
+    registrations_count = django.db.models.PositiveIntegerField(
+        default=0,
+        verbose_name="Registrations Count",
+    )
+    capacity = django.db.models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Capacity",
+    )
 
     class Meta:
         verbose_name = "Event"
         verbose_name_plural = "Events"
         indexes = [
             django.db.models.Index(
-                ["status", "event_date"], name="event_status_date_idx"
-            )
+                fields=["status", "event_date"], name="event_status_date_idx"
+            ),
+            django.db.models.Index(
+                fields=["place", "event_date"], name="event_place_date_idx"
+            ),
+            django.db.models.Index(
+                fields=["event_date", "id"], name="event_date_id_idx"
+            ),
         ]
 
     def __str__(self):
@@ -77,7 +92,13 @@ class EventRegistration(BaseModel):
         unique_together = ["event", "email"]  # One email per event
         indexes = [
             django.db.models.Index(fields=["event", "email"]),
-            django.db.models.Index(fields=["confirmation_code"]),
+        ]
+        constraints = [
+            # Confirmation looks registrations up by code within an event
+            django.db.models.UniqueConstraint(
+                fields=["event", "confirmation_code"],
+                name="registration_event_code_uniq",
+            ),
         ]
 
     def __str__(self):
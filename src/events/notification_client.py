@@ -0,0 +1,110 @@
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.core.circuit_breaker import get_circuit_breaker_for_url
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class NotificationClient:
+    """
+    Keep-alive HTTP client for the notification API
+
+    One pooled session is shared by the whole process, so emails reuse open
+    TCP/TLS connections instead of a handshake per request. Connection
+    errors and 5xx responses are retried with exponential backoff. Read
+    errors are not: the provider may already have accepted the email, and
+    sending the POST again would deliver it twice. Calls
+    go through the circuit breaker of the host and raise CircuitOpenError
+    while it is open.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        pool_size=10,
+        max_retries=3,
+        backoff_factor=0.5,
+        connect_timeout=3,
+        read_timeout=10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = get_circuit_breaker_for_url(self.base_url)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            # Hand the last 5xx response back instead of raising
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path, json, headers=None):
+        return self.breaker.call(
+            self.session.post,
+            f"{self.base_url}/{path.lstrip('/')}",
+            json=json,
+            headers=headers,
+            timeout=self.timeout,
+            is_failure=lambda response: response.status_code >= 500,
+        )
+
+    def close(self):
+        self.session.close()
+
+
+def build_notification_client():
+    return NotificationClient(
+        base_url=getattr(
+            settings, "NOTIFICATION_BASE_URL", "https://notifications.k3scluster.tech"
+        ),
+        pool_size=getattr(settings, "NOTIFICATION_POOL_SIZE", 10),
+        max_retries=getattr(settings, "NOTIFICATION_MAX_RETRIES", 3),
+        backoff_factor=getattr(settings, "NOTIFICATION_RETRY_BACKOFF", 0.5),
+        connect_timeout=getattr(settings, "NOTIFICATION_CONNECT_TIMEOUT", 3),
+        read_timeout=getattr(settings, "NOTIFICATION_READ_TIMEOUT", 10),
+    )
+
+
+def get_notification_client():
+    """
+    Process-wide notification client, created on first use
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_notification_client()
+    return _client
+
+
+def reset_notification_client():
+    """
+    Drop the shared client, e.g. after notification settings change
+    """
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,308 @@
+import logging
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import timezone
+
+from src.core.circuit_breaker import CircuitOpenError
+from src.sync.outbox_listener import OutboxListener
+from src.sync.outbox_services import (
+    NOTIFICATIONS_TOPIC,
+    LeaseRenewer,
+    OutboxService,
+    get_lease_seconds,
+    get_worker_id,
+)
+from src.sync.reports import publish_circuit_breakers, publish_report
+
+from .models import Event
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+METRICS_REPORT_KEY = "notification_dispatcher_metrics"
+# Seconds between metric reports while the queue is idle
+METRICS_IDLE_REPORT_SECONDS = 10
+
+
+class NotificationDispatcher:
+    """
+    Drain queued confirmation emails with bounded concurrency
+
+    Each batch is split into `concurrency` lanes by recipient. Lanes run in
+    a thread pool, messages within a lane go out in queue order, so one
+    recipient never gets emails out of order. With a provider bulk
+    endpoint configured a lane sends up to `bulk_size` emails per call.
+    """
+
+    def __init__(
+        self,
+        notification_service=None,
+        batch_size=500,
+        concurrency=10,
+        bulk_size=100,
+        poll_interval=1,
+    ):
+        self.notification_service = notification_service or NotificationService()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.bulk_size = bulk_size
+        self.poll_interval = poll_interval
+        self.running = False
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.outbox = OutboxService()
+        self.worker_id = get_worker_id()
+        self.lease_seconds = get_lease_seconds()
+        self.listener = OutboxListener([NOTIFICATIONS_TOPIC])
+        self.metrics = {
+            "started_at": timezone.now().isoformat(),
+            "batches": 0,
+            "sent_total": 0,
+            "failed_total": 0,
+            "last_batch": None,
+        }
+        self._reported_at = None
+        # Seconds until the notification circuit lets calls through again,
+        # set when the last batch hit an open circuit
+        self.circuit_retry_after = None
+
+    def run(self):
+        """
+        Dispatch batches until stopped
+        """
+        self.running = True
+        logger.info(
+            "Notification dispatcher started - Batch size: %s, Concurrency: %s, "
+            "Bulk: %s",
+            self.batch_size,
+            self.concurrency,
+            self.bulk_size if self.notification_service.supports_bulk() else "off",
+        )
+
+        try:
+            while self.running:
+                try:
+                    sent, failed = self.dispatch_batch()
+                except Exception as e:
+                    logger.error("Error in notification dispatcher loop: %s", e)
+                    time.sleep(10)
+                    continue
+
+                if sent == 0 and failed == 0:
+                    if self.circuit_retry_after:
+                        # The open circuit skipped every email. Not the
+                        # listener: it returns at once while registrations
+                        # keep arriving, claiming and releasing the batch.
+                        time.sleep(self.circuit_retry_after)
+                    else:
+                        self.listener.wait(self.poll_interval)
+        finally:
+            self.close()
+
+    def stop(self):
+        self.running = False
+        logger.info("Notification dispatcher stopped")
+
+    def close(self):
+        self.executor.shutdown()
+        self.listener.close()
+
+    def dispatch_batch(self):
+        """
+        Send one batch of queued emails, return (sent, failed)
+        """
+        started = time.perf_counter()
+        self.circuit_retry_after = None
+        messages = self.outbox.claim_messages(
+            self.worker_id, self.batch_size, [NOTIFICATIONS_TOPIC], self.lease_seconds
+        )
+
+        if not messages:
+            self._record_batch(0, 0, 0, started)
+            return 0, 0
+
+        event_names = self._get_event_names(messages)
+        lanes = self._split_lanes(messages)
+
+        # Sends run with no open transaction, the claimed messages are
+        # protected by their lease, which is renewed until all lanes finish.
+        with LeaseRenewer(
+            self.outbox, self.worker_id, [m.id for m in messages], self.lease_seconds
+        ):
+            results = list(
+                self.executor.map(
+                    lambda lane: self._send_lane(lane, event_names), lanes
+                )
+            )
+
+        sent_ids = [i for lane_sent, _ in results for i in lane_sent]
+        failed_ids = [i for _, lane_failed in results for i in lane_failed]
+        self._save_results(messages, sent_ids, failed_ids)
+
+        self._record_batch(len(messages), len(sent_ids), len(failed_ids), started)
+        return len(sent_ids), len(failed_ids)
+
+    def get_metrics(self):
+        return dict(self.metrics)
+
+    def _get_event_names(self, messages):
+        event_ids = {message.payload.get("event_id") for message in messages}
+        rows = Event.objects.filter(id__in=event_ids).values_list("id", "name")
+        return {str(event_id): name for event_id, name in rows}
+
+    def _split_lanes(self, messages):
+        lanes = [[] for _ in range(self.concurrency)]
+
+        for message in messages:
+            recipient = (message.payload.get("email") or "").lower()
+            lanes[zlib.crc32(recipient.encode()) % self.concurrency].append(message)
+
+        return [lane for lane in lanes if lane]
+
+    def _send_lane(self, lane, event_names):
+        """
+        Send lane messages in order, return (sent_ids, failed_ids)
+
+        After a failure the remaining emails of that recipient stay queued,
+        so a retry can never overtake an earlier email.
+        """
+        sent_ids = []
+        failed_ids = []
+        blocked = set()
+        pending = []
+
+        for message in lane:
+            payload = message.payload
+            recipient = (payload.get("email") or "").lower()
+            if recipient in blocked:
+                continue
+
+            email = self._build_email(payload, event_names)
+            if email is None:
+                failed_ids.append(message.id)
+                blocked.add(recipient)
+                continue
+
+            pending.append((message.id, recipient, email))
+
+        if self.notification_service.supports_bulk():
+            chunks = [
+                pending[i : i + self.bulk_size]
+                for i in range(0, len(pending), self.bulk_size)
+            ]
+        else:
+            chunks = [[item] for item in pending]
+
+        for chunk in chunks:
+            chunk = [item for item in chunk if item[1] not in blocked]
+            if not chunk:
+                continue
+
+            sent = self._send_chunk([email for _, _, email in chunk])
+
+            if sent:
+                sent_ids.extend(message_id for message_id, _, _ in chunk)
+                continue
+
+            # Not sent emails block their recipients, those skipped while
+            # the circuit is open stay queued without using up a retry.
+            if sent is not None:
+                failed_ids.extend(message_id for message_id, _, _ in chunk)
+            blocked.update(recipient for _, recipient, _ in chunk)
+
+        return sent_ids, failed_ids
+
+    def _send_chunk(self, emails):
+        """
+        Return True if sent, False if failed, None if the circuit is open
+        """
+        try:
+            if len(emails) == 1:
+                return self.notification_service.send_confirmation_email(**emails[0])
+            return self.notification_service.send_confirmation_emails(emails)
+        except CircuitOpenError as e:
+            logger.warning("Notification service unavailable: %s", e)
+            self.circuit_retry_after = max(self.circuit_retry_after or 0, e.retry_after)
+            return None
+        except Exception as e:
+            logger.error("Error sending notifications: %s", e)
+            return False
+
+    def _build_email(self, payload, event_names):
+        if payload.get("action") != "confirmation_email":
+            logger.error("Unknown notification action: %s", payload.get("action"))
+            return None
+
+        event_name = event_names.get(payload.get("event_id"))
+        if event_name is None:
+            logger.error("Event %s of notification not found", payload["event_id"])
+            return None
+
+        return {
+            "email": payload["email"],
+            "full_name": payload["full_name"],
+            "confirmation_code": payload["confirmation_code"],
+            "event_name": event_name,
+        }
+
+    def _save_results(self, messages, sent_ids, failed_ids):
+        """
+        Write results only for messages this dispatcher still holds a lease on
+        """
+        done = set(sent_ids) | set(failed_ids)
+        skipped_ids = [message.id for message in messages if message.id not in done]
+        written = 0
+
+        if sent_ids:
+            written += self.outbox.mark_sent(self.worker_id, sent_ids)
+        if failed_ids:
+            written += self.outbox.mark_failed(self.worker_id, failed_ids)
+        if skipped_ids:
+            written += self.outbox.release_messages(self.worker_id, skipped_ids)
+
+        if written < len(messages):
+            logger.warning(
+                "Lost the lease of %s notifications, their results were not saved",
+                len(messages) - written,
+            )
+
+    def _record_batch(self, size, sent, failed, started):
+        """
+        Update metrics and publish them with the circuit breaker states for
+        the web process
+
+        Empty polls only refresh the report every METRICS_IDLE_REPORT_SECONDS.
+        Queue depth is counted when the metrics are read, not per poll.
+        """
+        elapsed = time.perf_counter() - started
+
+        if size:
+            self.metrics["batches"] += 1
+            self.metrics["sent_total"] += sent
+            self.metrics["failed_total"] += failed
+            self.metrics["last_batch"] = {
+                "size": size,
+                "sent": sent,
+                "failed": failed,
+                "seconds": round(elapsed, 3),
+                "emails_per_second": round(sent / elapsed, 1) if elapsed else None,
+            }
+            logger.info(
+                "Notification batch - Sent: %s, Failed: %s, %.1f emails/s",
+                sent,
+                failed,
+                sent / elapsed if elapsed else 0,
+            )
+        elif (
+            self._reported_at is not None
+            and time.monotonic() - self._reported_at < METRICS_IDLE_REPORT_SECONDS
+        ):
+            return
+
+        self.metrics["updated_at"] = timezone.now().isoformat()
+        publish_report(
+            METRICS_REPORT_KEY, self.metrics, "Notification dispatcher metrics"
+        )
+        publish_circuit_breakers("notification_dispatcher")
+        self._reported_at = time.monotonic()
@@ -3,6 +3,11 @@ import logging
 import requests
 from django.conf import settings
 
+from src.sync.outbox_services import BaseMessageProducer
+
+from .models import Event
+from .notification_client import get_notification_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,47 +16,77 @@ class NotificationService:
     Service for sending notifications via external API
     """
 
-    BASE_URL = "https://notifications.k3scluster.tech/"
-
-    def __init__(self):
+    def __init__(self, client=None):
         self.jwt_token = getattr(settings, "NOTIFICATION_JWT_TOKEN", "")
         self.owner_id = getattr(settings, "NOTIFICATION_OWNER_ID", "")
+        self.client = client
 
-    def send_confirmation_email(self, email, full_name, confirmation_code, even_name):
+    def build_confirmation_email(self, email, full_name, confirmation_code, event_name):
         """
-        Send confirmation email with verification code
+        Build notification API payload of a confirmation email
         """
-        subject = f"Registration Confirmation: {even_name}"
+        subject = f"Registration Confirmation: {event_name}"
         message = f"""
         Hello {full_name}!
         
-        You have successfully registered for the event "{even_name}".
+        You have successfully registered for the event "{event_name}".
         
         Your confirmation code: {confirmation_code}
         """
 
-        payload = {
+        return {
             "owner_id": self.owner_id,
             "to": email,
             "subject": subject,
             "message": message,
             "notification_type": "email",
         }
+
+    def send_confirmation_email(self, email, full_name, confirmation_code, event_name):
+        """
+        Send confirmation email with verification code
+        """
+        payload = self.build_confirmation_email(
+            email, full_name, confirmation_code, event_name
+        )
+        return self._post("api/notifications", payload, email)
+
+    def supports_bulk(self):
+        """
+        Check if the provider bulk endpoint is configured
+        """
+        return bool(getattr(settings, "NOTIFICATION_BULK_PATH", ""))
+
+    def send_confirmation_emails(self, emails):
+        """
+        Send several confirmation emails with one bulk API call
+
+        `emails` are keyword arguments of send_confirmation_email. The call
+        succeeds or fails as a whole.
+        """
+        payload = {
+            "notifications": [
+                self.build_confirmation_email(**email) for email in emails
+            ]
+        }
+        return self._post(
+            settings.NOTIFICATION_BULK_PATH, payload, f"{len(emails)} recipients"
+        )
+
+    def _post(self, path, payload, recipient):
+        # CircuitOpenError propagates, nothing was sent so callers should
+        # not count it as a delivery attempt.
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.jwt_token}",
         }
 
         try:
-            response = requests.post(
-                f"{self.BASE_URL}/api/notifications",
-                json=payload,
-                headers=headers,
-                timeout=10,
-            )
+            client = self.client or get_notification_client()
+            response = client.post(path, json=payload, headers=headers)
 
             if response.status_code == 200:
-                logger.info(f"Notification sent successfully to {email}")
+                logger.info(f"Notification sent successfully to {recipient}")
                 return True
             else:
                 logger.error(
@@ -69,3 +104,37 @@ class NotificationService:
         Check if notification credentials are configured
         """
         return bool(self.jwt_token and self.owner_id)
+
+
+class NotificationProducer(BaseMessageProducer):
+    """
+    Outbox producer delivering queued notifications via NotificationService
+    """
+
+    def __init__(self, notification_service=None):
+        self.notification_service = notification_service or NotificationService()
+
+    def send_message(self, topic, payload):
+        """
+        Send notification described by outbox message payload
+        """
+        if payload.get("action") != "confirmation_email":
+            logger.error("Unknown notification action: %s", payload.get("action"))
+            return False
+
+        event_name = (
+            Event.objects.filter(id=payload["event_id"])
+            .values_list("name", flat=True)
+            .first()
+        )
+
+        if event_name is None:
+            logger.error("Event %s of notification not found", payload["event_id"])
+            return False
+
+        return self.notification_service.send_confirmation_email(
+            email=payload["email"],
+            full_name=payload["full_name"],
+            confirmation_code=payload["confirmation_code"],
+            event_name=event_name,
+        )
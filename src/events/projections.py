@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+# Output field -> values() lookup, in the field order of the serializers
+EVENT_LIST_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "status": "status",
+    "place_name": "place__name",
+    "registrations_count": "registrations_count",
+    "capacity": "capacity",
+    "created_at": "created_at",
+}
+
+EVENT_DETAIL_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "event_date": "event_date",
+    "status": "status",
+    "place_name": "place__name",
+    "registrations_count": "registrations_count",
+    "capacity": "capacity",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+# Keyset pagination needs these on every row even if they are not rendered
+CURSOR_COLUMNS = ("event_date", "id")
+
+# Serializers skip `place.name` sources for events without place
+OPTIONAL_FIELDS = {"place_name"}
+
+
+def format_datetime(value):
+    """
+    Format datetime the same way DRF DateTimeField does
+    """
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def to_primitive(value):
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def get_projection_queryset(queryset, fields, extra_columns=()):
+    """
+    Select only the columns needed to render given fields
+    """
+    columns = dict.fromkeys([*fields.values(), *extra_columns])
+    return queryset.values(*columns)
+
+
+def project_event(row, fields):
+    """
+    Render values() row to the same dict the matching serializer produces
+    """
+    data = {}
+
+    for name, column in fields.items():
+        value = row[column]
+        if value is None and name in OPTIONAL_FIELDS:
+            continue
+        data[name] = to_primitive(value)
+
+    return data
+
+
+def project_events(rows, fields):
+    return [project_event(row, fields) for row in rows]
@@ -0,0 +1,259 @@
+import logging
+import secrets
+import string
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from src.sync.outbox_services import OutboxService
+
+from .cache import invalidate_event_details
+from .models import Event, EventRegistration, EventsStatus
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+CONFIRMATION_CODE_ALPHABET = string.ascii_uppercase + string.digits
+CONFIRMATION_CODE_LENGTH = 6
+# Codes are unique per event, a colliding code is replaced this many times
+CONFIRMATION_CODE_ATTEMPTS = 5
+CONFIRMATION_CODE_CONSTRAINT = "registration_event_code_uniq"
+
+
+def generate_confirmation_code():
+    return "".join(
+        secrets.choice(CONFIRMATION_CODE_ALPHABET)
+        for _ in range(CONFIRMATION_CODE_LENGTH)
+    )
+
+
+def is_confirmation_code_conflict(error):
+    """
+    Whether an IntegrityError comes from a confirmation code already taken
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == CONFIRMATION_CODE_CONSTRAINT
+
+
+class RegistrationError(Exception):
+    field = "non_field_errors"
+    status_code = 400
+
+
+class EventNotFound(RegistrationError):
+    field = "event_id"
+
+
+class RegistrationClosed(RegistrationError):
+    field = "event_id"
+
+
+class EventSoldOut(RegistrationError):
+    field = "event_id"
+    status_code = 409
+
+
+class AlreadyRegistered(RegistrationError):
+    field = "email"
+
+
+class InvalidConfirmationCode(RegistrationError):
+    field = "confirmation_code"
+
+
+class AlreadyConfirmed(RegistrationError):
+    field = "confirmation_code"
+
+
+class RegistrationService:
+    """
+    Service for event registrations and their counters
+    """
+
+    def register(self, event_id, full_name, email):
+        """
+        Register attendee with no reads on the success path
+
+        The registration and its outbox message are inserted first, the
+        unique (event, email) constraint rejects duplicates. The conditional
+        counter UPDATE runs last and checks that the event exists, is open
+        and has a free seat, the transaction is rolled back when it does not.
+        A confirmation code already taken in the event is replaced and the
+        registration retried. Returns (registration, email_queued).
+        """
+        for _ in range(CONFIRMATION_CODE_ATTEMPTS):
+            try:
+                registration, email_queued = self._insert_registration(
+                    event_id, full_name, email
+                )
+            except IntegrityError as e:
+                if is_confirmation_code_conflict(e):
+                    continue
+                raise AlreadyRegistered("You are already registered for this event")
+
+            invalidate_event_details([event_id])
+            return registration, email_queued
+
+        raise RegistrationError("Could not generate a confirmation code, try again")
+
+    @transaction.atomic
+    def _insert_registration(self, event_id, full_name, email):
+        registration = EventRegistration.objects.create(
+            event_id=event_id,
+            full_name=full_name,
+            email=email,
+            confirmation_code=generate_confirmation_code(),
+        )
+        email_queued = self._queue_confirmation_email(registration)
+
+        if not self._take_seat(event_id):
+            raise self._get_rejection(event_id)
+        return registration, email_queued
+
+    def _take_seat(self, event_id):
+        # Seat check and increment are one statement: PostgreSQL re-checks
+        # the WHERE clause on the freshly locked row, so concurrent requests
+        # can never push the counter past capacity. It is the last statement
+        # of the transaction, so the event row stays locked only until
+        # COMMIT.
+        return (
+            Event.objects.filter(id=event_id, status=EventsStatus.OPEN)
+            .filter(Q(capacity__isnull=True) | Q(registrations_count__lt=F("capacity")))
+            .update(
+                registrations_count=F("registrations_count") + 1,
+                updated_at=Now(),
+            )
+        )
+
+    def _get_rejection(self, event_id):
+        """
+        Explain why no seat was taken, only runs on the failure path
+        """
+        event_status = (
+            Event.objects.filter(id=event_id).values_list("status", flat=True).first()
+        )
+
+        if event_status is None:
+            return EventNotFound("Event not found")
+        if event_status != EventsStatus.OPEN:
+            return RegistrationClosed("Registration for this event closed")
+        return EventSoldOut("Event is sold out")
+
+    def _queue_confirmation_email(self, registration):
+        # The email is sent by the notification dispatcher once this
+        # transaction commits, so provider latency never holds it open.
+        if not NotificationService().is_configured():
+            return False
+
+        OutboxService().create_confirmation_email_message(registration)
+        return True
+
+    def confirm(self, event_id, confirmation_code):
+        """
+        Confirm registration by its code with one conditional UPDATE
+
+        The unique (event, confirmation_code) constraint makes the statement
+        touch at most one row, independent of the registrations table size.
+        """
+        confirmed = EventRegistration.objects.filter(
+            event_id=event_id, confirmation_code=confirmation_code, is_confirmed=False
+        ).update(is_confirmed=True, updated_at=Now())
+
+        if confirmed:
+            return confirmed
+
+        if EventRegistration.objects.filter(
+            event_id=event_id, confirmation_code=confirmation_code
+        ).exists():
+            raise AlreadyConfirmed("Registration already confirmed")
+        raise InvalidConfirmationCode("Invalid confirmation code")
+
+    def confirm_batch(self, event_id, confirmation_codes):
+        """
+        Confirm many registrations with one SELECT and one UPDATE
+
+        Returns codes split into confirmed, already_confirmed and not_found.
+        """
+        codes = list(dict.fromkeys(confirmation_codes))
+
+        with transaction.atomic():
+            rows = (
+                EventRegistration.objects.select_for_update()
+                .filter(event_id=event_id, confirmation_code__in=codes)
+                .values_list("id", "confirmation_code", "is_confirmed")
+            )
+            # Codes are unique per event, each matches at most one row
+            pending = {}
+            confirmed_before = set()
+            for registration_id, code, is_confirmed in rows:
+                if is_confirmed:
+                    confirmed_before.add(code)
+                else:
+                    pending[code] = registration_id
+
+            if pending:
+                EventRegistration.objects.filter(id__in=pending.values()).update(
+                    is_confirmed=True, updated_at=Now()
+                )
+
+        return {
+            "confirmed": [code for code in codes if code in pending],
+            "already_confirmed": [
+                code
+                for code in codes
+                if code in confirmed_before and code not in pending
+            ],
+            "not_found": [
+                code
+                for code in codes
+                if code not in pending and code not in confirmed_before
+            ],
+        }
+
+    def increment_count(self, event_id, amount=1):
+        """
+        Atomically add registrations to the event counter
+        """
+        return Event.objects.filter(id=event_id).update(
+            registrations_count=F("registrations_count") + amount,
+            updated_at=Now(),
+        )
+
+    def reconcile_counts(self, event_ids=None):
+        """
+        Recompute registration counters from registrations in set-based SQL
+
+        Only drifted events are updated, returns their number. Drifted ids
+        are selected first so their cached representations can be dropped.
+        """
+        actual = Coalesce(
+            Subquery(
+                EventRegistration.objects.filter(event=OuterRef("pk"))
+                .order_by()
+                .values("event")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        events = Event.objects.all()
+
+        if event_ids is not None:
+            events = events.filter(id__in=event_ids)
+
+        drifted = list(
+            events.alias(actual=actual)
+            .exclude(registrations_count=F("actual"))
+            .values_list("id", flat=True)
+        )
+
+        if drifted:
+            Event.objects.filter(id__in=drifted).update(
+                registrations_count=actual, updated_at=Now()
+            )
+            invalidate_event_details(drifted)
+
+        logger.info("Reconciled registration counters for %s events", len(drifted))
+        return len(drifted)
@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.core.validators import validate_email
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from .models import Event, EventRegistration, Place
+from .models import Event, EventRegistration, EventsStatus, Place
+from .pagination import InvalidCursor, decode_cursor, get_page_size_limits
+from .projections import EVENT_DETAIL_FIELDS
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -11,8 +14,17 @@ class EventSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = ["id", "name", "event_date", "status", "place_id", "place_name"]
-        read_only_fields = ["id", "status", "place_name"]
+        fields = [
+            "id",
+            "name",
+            "event_date",
+            "status",
+            "place_id",
+            "place_name",
+            "capacity",
+            "registrations_count",
+        ]
+        read_only_fields = ["id", "status", "place_name", "registrations_count"]
 
     def create(self, validated_data):
         place_id = validated_data.pop("place_id", None)
@@ -32,7 +44,15 @@ class EventListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = ["id", "name", "status", "place_name", "created_at"]
+        fields = [
+            "id",
+            "name",
+            "status",
+            "place_name",
+            "registrations_count",
+            "capacity",
+            "created_at",
+        ]
 
 
 class EventDetailSerializer(serializers.ModelSerializer):
@@ -46,11 +66,89 @@ class EventDetailSerializer(serializers.ModelSerializer):
             "event_date",
             "status",
             "place_name",
+            "registrations_count",
+            "capacity",
             "created_at",
             "updated_at",
         ]
 
 
+class EventFieldsQuerySerializer(serializers.Serializer):
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, value):
+        requested = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = requested - EVENT_DETAIL_FIELDS.keys()
+
+        if not requested:
+            raise serializers.ValidationError("At least one field is required")
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+        return {
+            name: column
+            for name, column in EVENT_DETAIL_FIELDS.items()
+            if name in requested
+        }
+
+
+class EventFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=EventsStatus.choices, required=False)
+    event_date__gte = serializers.DateTimeField(required=False)
+    event_date__lte = serializers.DateTimeField(required=False)
+    place_id = serializers.UUIDField(required=False)
+    upcoming = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        date_from = data.get("event_date__gte")
+        date_to = data.get("event_date__lte")
+
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                {"event_date__lte": "Must not be earlier than event_date__gte"}
+            )
+        return data
+
+
+class EventListQuerySerializer(EventFieldsQuerySerializer, EventFilterSerializer):
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(required=False, min_value=1)
+    with_total = serializers.BooleanField(required=False, default=False)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except InvalidCursor as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate_page_size(self, value):
+        _, max_page_size = get_page_size_limits()
+        return min(value, max_page_size)
+
+    def validate(self, data):
+        data = super().validate(data)
+
+        if "page_size" not in data:
+            data["page_size"], _ = get_page_size_limits()
+        return data
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(
+        choices=["ndjson", "csv"], required=False, default="ndjson"
+    )
+
+
+class EventExportQuerySerializer(ExportQuerySerializer, EventFilterSerializer):
+    pass
+
+
+class RegistrationExportQuerySerializer(ExportQuerySerializer):
+    confirmed_only = serializers.BooleanField(required=False, default=False)
+
+
 class EventRegistrationSerializer(serializers.ModelSerializer):
     event_id = serializers.UUIDField(write_only=True)
 
@@ -72,23 +170,22 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid email format")
         return value.lower()
 
-    def validate(self, data):
-        event_id = data.get("event_id")
-        email = data.get("email")
 
-        try:
-            event = Event.objects.get(id=event_id)
-            if event.status != "open":
-                raise serializers.ValidationError(
-                    {"event_id": "Registration for this event closed"}
-                )
-        except Event.DoesNotExist:
-            raise serializers.ValidationError({"event_id": "Event not found"})
-
-        if EventRegistration.objects.filter(event_id=event_id, email=email).exists():
-            raise serializers.ValidationError(
-                {"email": "You are already registered for this event"}
-            )
-        data["event"] = event
+class RegistrationConfirmSerializer(serializers.Serializer):
+    confirmation_code = serializers.CharField(max_length=6)
 
-        return data
+    def validate_confirmation_code(self, value):
+        return value.strip().upper()
+
+
+class RegistrationBatchConfirmSerializer(serializers.Serializer):
+    confirmation_codes = serializers.ListField(
+        child=serializers.CharField(max_length=6), allow_empty=False
+    )
+
+    def validate_confirmation_codes(self, value):
+        max_items = getattr(settings, "EVENTS_CONFIRM_BATCH_MAX_ITEMS", 200)
+
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"Ensure at most {max_items} items")
+        return [code.strip().upper() for code in value]
@@ -1 +1,453 @@
-# Create your tests here.
+import json
+import threading
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from src.core.circuit_breaker import CircuitOpenError
+from src.sync.models import OutboxMessage
+from src.sync.outbox_services import NOTIFICATIONS_TOPIC, OutboxService
+
+from .cache import get_event_version, get_events_version
+from .filters import apply_event_filters
+from .models import Event, EventRegistration, EventsStatus
+from .notification_dispatcher import NotificationDispatcher
+from .pagination import EventCursorPaginator
+from .registration_services import (
+    AlreadyRegistered,
+    RegistrationClosed,
+    RegistrationError,
+    RegistrationService,
+)
+
+
+class EventQueryPlanTests(TestCase):
+    """
+    Check that event list queries are served by indexes
+
+    Queries are explained with sequential scans disabled. The planner still
+    picks a sequential scan when no index can serve the query, so any left
+    in the plan mean a missing index.
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # Rolled back with the test transaction
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def _get_cases(self):
+        now = timezone.now()
+        cursor = (now, uuid.uuid4())
+        place_id = uuid.uuid4()
+        date_range = {
+            "event_date__gte": now,
+            "event_date__lte": now + timedelta(days=30),
+        }
+
+        return [
+            ("first page", {}, None),
+            ("next page", {}, cursor),
+            ("status", {"status": EventsStatus.OPEN}, None),
+            ("status + dates", {"status": EventsStatus.OPEN, **date_range}, None),
+            ("dates", date_range, cursor),
+            ("place", {"place_id": place_id}, None),
+            ("place + next page", {"place_id": place_id}, cursor),
+            ("upcoming", {"upcoming": True}, None),
+        ]
+
+    def _walk(self, node):
+        yield node
+        for child in node.get("Plans", []):
+            yield from self._walk(child)
+
+    def test_list_queries_do_not_scan_events(self):
+        paginator = EventCursorPaginator(page_size=50)
+        table = Event._meta.db_table
+
+        for name, params, page_cursor in self._get_cases():
+            with self.subTest(name):
+                queryset = apply_event_filters(
+                    Event.objects.select_related("place"), params
+                )
+                queryset = paginator.get_page_queryset(queryset, page_cursor)
+                plan = json.loads(queryset.explain(format="json"))
+
+                scans = [
+                    node
+                    for node in self._walk(plan[0]["Plan"])
+                    if node["Node Type"] == "Seq Scan"
+                    and node.get("Relation Name") == table
+                ]
+                self.assertEqual(scans, [])
+
+
+@override_settings(NOTIFICATION_JWT_TOKEN="token", NOTIFICATION_OWNER_ID="1")
+class RegistrationQueryCountTests(TestCase):
+    """
+    Pin the number of statements of the registration hot path
+
+    Inside the test transaction `register` runs in a savepoint, so every
+    count includes SAVEPOINT and RELEASE SAVEPOINT, failures also
+    ROLLBACK TO SAVEPOINT.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name="Conf", event_date=timezone.now())
+        self.service = RegistrationService()
+
+    def test_successful_registration(self):
+        # INSERT registration, INSERT outbox message, conditional UPDATE
+        with self.assertNumQueries(5):
+            registration, email_queued = self.service.register(
+                self.event.id, "Ada Lovelace", "ada@example.com"
+            )
+
+        self.assertTrue(email_queued)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registrations_count, 1)
+        self.assertTrue(
+            OutboxMessage.objects.filter(
+                payload__registration_id=str(registration.id)
+            ).exists()
+        )
+
+    def test_duplicate_registration(self):
+        self.service.register(self.event.id, "Ada Lovelace", "ada@example.com")
+
+        # The failed INSERT rolls back the savepoint, nothing else runs
+        with self.assertNumQueries(4):
+            with self.assertRaises(AlreadyRegistered) as raised:
+                self.service.register(self.event.id, "Ada", "ada@example.com")
+
+        self.assertEqual(raised.exception.status_code, 400)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registrations_count, 1)
+
+    def test_closed_event(self):
+        Event.objects.filter(id=self.event.id).update(status=EventsStatus.CLOSED)
+
+        # Both INSERTs, the UPDATE matching no row and the status lookup
+        # explaining the rejection
+        with self.assertNumQueries(7):
+            with self.assertRaises(RegistrationClosed):
+                self.service.register(self.event.id, "Ada", "ada@example.com")
+
+        self.assertFalse(EventRegistration.objects.exists())
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(NOTIFICATION_JWT_TOKEN="token", NOTIFICATION_OWNER_ID="1")
+class RegistrationCacheTests(TestCase):
+    def test_registration_keeps_event_lists_cached(self):
+        cache.clear()
+        event = Event.objects.create(name="Conf", event_date=timezone.now())
+        list_version = get_events_version()
+        event_version = get_event_version(event.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RegistrationService().register(event.id, "Ada Lovelace", "ada@example.com")
+
+        self.assertEqual(get_events_version(), list_version)
+        self.assertNotEqual(get_event_version(event.id), event_version)
+
+
+@override_settings(NOTIFICATION_JWT_TOKEN="token", NOTIFICATION_OWNER_ID="1")
+class RegistrationConcurrencyTests(TransactionTestCase):
+    """
+    Register from many threads, each with its own database connection,
+    against an event with fewer seats than attempts
+    """
+
+    def test_concurrent_registrations_do_not_overbook(self):
+        cache.clear()
+        event = Event.objects.create(
+            name="Conf", event_date=timezone.now(), capacity=50
+        )
+        service = RegistrationService()
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def register(index):
+            try:
+                service.register(
+                    event.id, f"Attendee {index}", f"attendee{index}@example.com"
+                )
+                outcome = "registered"
+            except RegistrationError as e:
+                outcome = type(e).__name__
+            finally:
+                connection.close()
+            with lock:
+                outcomes[outcome] += 1
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(register, range(200)))
+
+        event.refresh_from_db()
+        self.assertEqual(outcomes["registered"], 50)
+        self.assertEqual(outcomes.total(), 200)
+        self.assertEqual(event.registrations.count(), 50)
+        self.assertEqual(event.registrations_count, 50)
+
+
+class RegistrationEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name="Conf", event_date=timezone.now())
+        # Admission control verifies the access token before the view runs
+        token = AccessToken.for_user(User.objects.create_user("attendee"))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = f"/api/events/{self.event.id}/register/"
+
+    def test_duplicate_registration_is_bad_request(self):
+        data = {"full_name": "Ada Lovelace", "email": "ada@example.com"}
+
+        self.assertEqual(self.client.post(self.url, data).status_code, 201)
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.data["errors"])
+
+    def test_malformed_authorization_header_is_unauthorized(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer a b")
+
+        response = client.post(
+            self.url, {"full_name": "Ada Lovelace", "email": "ada@example.com"}
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    @override_settings(EVENTS_REGISTRATION_EVENT_RATE=(5, 60))
+    def test_anonymous_requests_do_not_use_event_limit(self):
+        anonymous = APIClient()
+        for index in range(6):
+            response = anonymous.post(
+                self.url, {"full_name": "Anon", "email": f"anon{index}@example.com"}
+            )
+            self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            self.url, {"full_name": "Ada Lovelace", "email": "ada@example.com"}
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+class RegistrationExportTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name="Conf", event_date=timezone.now())
+        EventRegistration.objects.create(
+            event=self.event,
+            full_name="Ada Lovelace",
+            email="ada@example.com",
+            confirmation_code="ABC123",
+        )
+        self.url = f"/api/events/{self.event.id}/registrations/export/?output=csv"
+        self.client = APIClient()
+
+    def test_regular_users_cannot_export(self):
+        self.client.force_authenticate(User.objects.create_user("attendee"))
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_staff_export_has_no_confirmation_codes(self):
+        self.client.force_authenticate(
+            User.objects.create_user("organizer", is_staff=True)
+        )
+
+        response = self.client.get(self.url)
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ada@example.com", content)
+        self.assertNotIn("confirmation_code", content)
+        self.assertNotIn("ABC123", content)
+
+
+class RegistrationImportTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Conf", event_date=timezone.now(), capacity=2
+        )
+        self.url = f"/api/events/{self.event.id}/registrations/import/"
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user("organizer", is_staff=True)
+        )
+
+    def _upload(self, rows):
+        content = "full_name,email\n" + "".join(
+            f"Attendee {index},attendee{index}@example.com\n" for index in rows
+        )
+        return self.client.post(
+            self.url,
+            {"file": SimpleUploadedFile("attendees.csv", content.encode())},
+            format="multipart",
+        )
+
+    def test_regular_users_cannot_import(self):
+        self.client.force_authenticate(User.objects.create_user("attendee"))
+
+        self.assertEqual(self._upload(range(1)).status_code, 403)
+        self.assertFalse(EventRegistration.objects.exists())
+
+    def test_closed_event_is_rejected(self):
+        Event.objects.filter(id=self.event.id).update(status=EventsStatus.CLOSED)
+
+        response = self._upload(range(1))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("event_id", response.data["errors"])
+        self.assertFalse(EventRegistration.objects.exists())
+
+    def test_capacity_is_enforced(self):
+        response = self._upload(range(3))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["inserted"], 2)
+        self.assertEqual(response.data["sold_out"], 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registrations_count, 2)
+        self.assertEqual(EventRegistration.objects.count(), 2)
+
+
+class RegistrationConfirmTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name="Conf", event_date=timezone.now())
+        self.registration = EventRegistration.objects.create(
+            event=self.event,
+            full_name="Ada Lovelace",
+            email="ada@example.com",
+            confirmation_code="ABC123",
+        )
+        self.url = f"/api/events/{self.event.id}/confirm/"
+        self.batch_url = f"/api/events/{self.event.id}/confirm/batch/"
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user("organizer", is_staff=True)
+        )
+
+    def test_regular_users_cannot_confirm(self):
+        self.client.force_authenticate(User.objects.create_user("attendee"))
+
+        response = self.client.post(self.url, {"confirmation_code": "ABC123"})
+        batch_response = self.client.post(
+            self.batch_url, {"confirmation_codes": ["ABC123"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(batch_response.status_code, 403)
+        self.registration.refresh_from_db()
+        self.assertFalse(self.registration.is_confirmed)
+
+    def test_staff_confirms_registration(self):
+        response = self.client.post(self.url, {"confirmation_code": "ABC123"})
+
+        self.assertEqual(response.status_code, 200)
+        self.registration.refresh_from_db()
+        self.assertTrue(self.registration.is_confirmed)
+
+    @override_settings(EVENTS_CONFIRM_RATE=(2, 60))
+    def test_confirm_requests_are_rate_limited(self):
+        for _ in range(2):
+            response = self.client.post(
+                self.batch_url, {"confirmation_codes": ["XXXXXX"]}, format="json"
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            self.batch_url, {"confirmation_codes": ["XXXXXX"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+
+@override_settings(NOTIFICATION_JWT_TOKEN="token", NOTIFICATION_OWNER_ID="1")
+class NotificationDispatcherTests(TestCase):
+    def test_recipients_get_emails_in_order_through_a_failure(self):
+        event = Event.objects.create(name="Conf", event_date=timezone.now())
+        OutboxService().create_messages(
+            NOTIFICATIONS_TOPIC,
+            [
+                {
+                    "registration_id": str(index),
+                    "event_id": str(event.id),
+                    "email": f"attendee{index % 5}@example.com",
+                    "full_name": f"Attendee {index}",
+                    "confirmation_code": f"{index:06d}",
+                    "action": "confirmation_email",
+                }
+                for index in range(60)
+            ],
+        )
+        received = []
+        failed = set()
+        lock = threading.Lock()
+
+        def send(email, confirmation_code, **kwargs):
+            with lock:
+                # The third email of attendee1 fails once, the rest of that
+                # recipient waits for its retry
+                if confirmation_code == "000011" and "000011" not in failed:
+                    failed.add(confirmation_code)
+                    return False
+                received.append((email, confirmation_code))
+            return True
+
+        service = mock.Mock()
+        service.supports_bulk.return_value = False
+        service.send_confirmation_email.side_effect = send
+        dispatcher = NotificationDispatcher(notification_service=service, concurrency=4)
+        try:
+            self.assertEqual(dispatcher.dispatch_batch(), (50, 1))
+            # The retry backoff has passed
+            OutboxMessage.objects.filter(retry_count=1).update(
+                last_retry_at=timezone.now() - timedelta(minutes=1)
+            )
+            self.assertEqual(dispatcher.dispatch_batch(), (10, 0))
+        finally:
+            dispatcher.close()
+
+        codes = defaultdict(list)
+        for email, code in received:
+            codes[email].append(code)
+        self.assertEqual(len(received), 60)
+        for email_codes in codes.values():
+            self.assertEqual(email_codes, sorted(email_codes))
+
+    def test_sleeps_while_circuit_is_open(self):
+        event = Event.objects.create(name="Conf", event_date=timezone.now())
+        RegistrationService().register(event.id, "Ada Lovelace", "ada@example.com")
+        service = mock.Mock()
+        service.supports_bulk.return_value = False
+        service.send_confirmation_email.side_effect = CircuitOpenError("api", 12)
+        dispatcher = NotificationDispatcher(notification_service=service)
+        dispatcher.listener = mock.Mock()
+
+        with mock.patch(
+            "src.events.notification_dispatcher.time.sleep",
+            side_effect=lambda seconds: dispatcher.stop(),
+        ) as sleep:
+            dispatcher.run()
+
+        # The skipped batch is not followed by an immediate claim
+        sleep.assert_called_once_with(12)
+        dispatcher.listener.wait.assert_not_called()
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.retry_count, message.claimed_by), (0, ""))
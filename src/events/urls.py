@@ -1,13 +1,37 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "events"
 
 urlpatterns = [
     path("", views.event_list_protected, name="event_list"),
     path("create/", views.create_event, name="create_event"),
+    path("bulk/", views.bulk_events, name="event-bulk"),
+    path("export/", views.export_events, name="event-export"),
+    path("async/", async_views.event_list, name="event_list_async"),
+    path(
+        "async/<uuid:event_id>/",
+        async_views.event_detail,
+        name="event_detail_async",
+    ),
     path("<uuid:event_id>/", views.event_detail, name="event_detail"),
     path("<uuid:event_id>/update/", views.update_event, name="event-update"),
     path("<uuid:event_id>/register/", views.register_for_event, name="event-register"),
+    path("<uuid:event_id>/confirm/", views.confirm_registration, name="event-confirm"),
+    path(
+        "<uuid:event_id>/confirm/batch/",
+        views.confirm_registrations_batch,
+        name="event-confirm-batch",
+    ),
+    path(
+        "<uuid:event_id>/registrations/export/",
+        views.export_registrations,
+        name="event-registrations-export",
+    ),
+    path(
+        "<uuid:event_id>/registrations/import/",
+        views.import_registrations,
+        name="event-registrations-import",
+    ),
 ]
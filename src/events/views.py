@@ -1,51 +1,180 @@
-import uuid
+import csv
+import io
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import condition
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
 from src.sync.outbox_services import OutboxService
 
+from .admission import (
+    close_admission,
+    get_limiter,
+    registration_admission,
+    too_many_requests,
+)
+from .bulk_services import EventBulkService
+from .cache import (
+    get_cache_timeout,
+    get_event_detail_cache_key,
+    get_event_list_cache_key,
+    invalidate_events,
+)
+from .conditional import (
+    event_detail_etag,
+    event_detail_last_modified,
+    event_list_etag,
+    event_list_last_modified,
+)
+from .exporters import (
+    EVENT_EXPORT_COLUMNS,
+    EXPORT_CONTENT_TYPES,
+    REGISTRATION_EXPORT_COLUMNS,
+    stream_export,
+)
+from .filters import apply_event_filters
+from .import_services import ImportFormatError, RegistrationImportService
 from .models import Event, EventRegistration
-from .notification_service import NotificationService
+from .pagination import EventCursorPaginator
+from .projections import (
+    CURSOR_COLUMNS,
+    EVENT_DETAIL_FIELDS,
+    EVENT_LIST_FIELDS,
+    get_projection_queryset,
+    project_event,
+    project_events,
+)
+from .registration_services import (
+    EventSoldOut,
+    RegistrationClosed,
+    RegistrationError,
+    RegistrationService,
+)
 from .serializers import (
-    EventDetailSerializer,
-    EventListSerializer,
+    EventExportQuerySerializer,
+    EventFieldsQuerySerializer,
+    EventListQuerySerializer,
     EventRegistrationSerializer,
     EventSerializer,
+    RegistrationBatchConfirmSerializer,
+    RegistrationConfirmSerializer,
+    RegistrationExportQuerySerializer,
 )
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=event_list_etag, last_modified_func=event_list_last_modified)
 def event_list_protected(request):
     """
     Protected endpoint for retrieving events list
     Requires valid Access Token in Authorization header
+
+    Results are ordered by (event_date, id) and paginated with an opaque
+    `cursor` taken from `next_cursor` of the previous page.
+    Supports `status`, `event_date__gte`, `event_date__lte`, `place_id`
+    and `upcoming` filters, `fields` selects a subset of the event detail
+    fields to return. Answers If-None-Match / If-Modified-Since with
+    304 Not Modified
     """
-    events = Event.objects.select_related("place").all()
-    serializer = EventListSerializer(events, many=True)
+    query = EventListQuerySerializer(data=request.query_params)
+
+    if not query.is_valid():
+        return Response({"errors": query.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response({"events": serializer.data, "count": len(serializer.data)})
+    cache_key = get_event_list_cache_key(request.query_params)
+    data = cache.get(cache_key)
+
+    if data is not None:
+        return Response(data)
+
+    params = query.validated_data
+    fields = params.get("fields", EVENT_LIST_FIELDS)
+    events = apply_event_filters(Event.objects.all(), params)
+    paginator = EventCursorPaginator(page_size=params["page_size"])
+    rows = get_projection_queryset(events, fields, CURSOR_COLUMNS)
+    page, next_cursor = paginator.paginate(rows, params.get("cursor"))
+    page = project_events(page, fields)
+
+    data = {
+        "events": page,
+        "count": len(page),
+        "next_cursor": next_cursor,
+    }
+
+    if params["with_total"]:
+        data["total"], data["total_is_estimate"] = paginator.get_total(events)
+
+    cache.set(cache_key, data, get_cache_timeout())
+
+    return Response(data)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=event_detail_etag, last_modified_func=event_detail_last_modified)
 def event_detail(request, event_id):
     """
     Protected endpoint for retrieving event details
+    `fields` selects a subset of the fields to return
+    Answers If-None-Match / If-Modified-Since with 304 Not Modified
     """
-    try:
-        event = Event.objects.select_related("place").get(id=event_id)
-        serializer = EventDetailSerializer(event)
+    query = EventFieldsQuerySerializer(data=request.query_params)
 
-        return Response({"event": serializer.data})
+    if not query.is_valid():
+        return Response({"errors": query.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-    except Event.DoesNotExist:
+    fields = query.validated_data.get("fields", EVENT_DETAIL_FIELDS)
+    cache_key = get_event_detail_cache_key(event_id, fields)
+    data = cache.get(cache_key)
+
+    if data is not None:
+        return Response(data)
+
+    events = Event.objects.filter(id=event_id)
+    row = get_projection_queryset(events, fields).first()
+
+    if row is None:
         return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    data = {"event": project_event(row, fields)}
+    cache.set(cache_key, data, get_cache_timeout())
+
+    return Response(data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_events(request):
+    """
+    Protected endpoint for streaming the whole events catalog
+    Supports `output=ndjson|csv` and the same filters as the events list
+    """
+    query = EventExportQuerySerializer(data=request.query_params)
+
+    if not query.is_valid():
+        return Response({"errors": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    params = query.validated_data
+    output = params["output"]
+    events = apply_event_filters(Event.objects.all(), params).order_by(
+        "event_date", "id"
+    )
+
+    response = StreamingHttpResponse(
+        stream_export(events, EVENT_EXPORT_COLUMNS, output),
+        content_type=EXPORT_CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = f'attachment; filename="events.{output}"'
+
+    return response
+
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -64,6 +193,7 @@ def create_event(request):
         with transaction.atomic():
             event = serializer.save()
             OutboxService().create_event_created_message(event)
+            invalidate_events()
 
             return Response(
                 {
@@ -79,6 +209,41 @@ def create_event(request):
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_events(request):
+    """
+    Protected endpoint for creating and updating events in bulk with outbox
+    Items with `id` update existing events, the rest are created
+    """
+    items = request.data.get("events") if isinstance(request.data, dict) else None
+    max_items = getattr(settings, "EVENTS_BULK_MAX_ITEMS", 5000)
+
+    if not isinstance(items, list) or not items:
+        return Response(
+            {"errors": {"events": ["Expected a non-empty list"]}},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if len(items) > max_items:
+        return Response(
+            {"errors": {"events": [f"Ensure at most {max_items} items"]}},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        result = EventBulkService().apply(items)
+    except Exception:
+        return Response(
+            {"error": "Failed to apply events"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if result["errors"] and not result["created"] and not result["updated"]:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result)
+
+
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_event(request, event_id):
@@ -101,6 +266,7 @@ def update_event(request, event_id):
         with transaction.atomic():
             updated_event = serializer.save()
             OutboxService().create_event_updated_message(updated_event)
+            invalidate_events([updated_event.id])
 
             return Response(
                 {
@@ -115,6 +281,7 @@ def update_event(request, event_id):
         )
 
 
+@registration_admission
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def register_for_event(request, event_id):
@@ -132,39 +299,167 @@ def register_for_event(request, event_id):
         )
 
     try:
-        with transaction.atomic():
-            confirmation_code = str(uuid.uuid4())[:6].upper()
+        registration, email_queued = RegistrationService().register(
+            event_id=serializer.validated_data["event_id"],
+            full_name=serializer.validated_data["full_name"],
+            email=serializer.validated_data["email"],
+        )
+    except (EventSoldOut, RegistrationClosed) as e:
+        close_admission(event_id, e)
+        return Response({"errors": {e.field: [str(e)]}}, status=e.status_code)
+    except RegistrationError as e:
+        return Response({"errors": {e.field: [str(e)]}}, status=e.status_code)
+    except Exception:
+        return Response(
+            {"error": "An error occurred during registration"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
-            registration = EventRegistration.objects.create(
-                event=serializer.validated_data["event"],
-                full_name=serializer.validated_data["full_name"],
-                email=serializer.validated_data["email"],
-                confirmation_code=confirmation_code,
-            )
+    return Response(
+        {
+            "message": "Registration created successfully",
+            "registration_id": str(registration.id),
+            "confirmation_code": registration.confirmation_code,
+            "email_queued": email_queued,
+        },
+        status=status.HTTP_201_CREATED,
+    )
 
-            notification_service = NotificationService()
-            email_sent = False
 
-            if notification_service.is_configured():
-                email_sent = notification_service.send_confirmation_email(
-                    email=registration.email,
-                    full_name=registration.full_name,
-                    confirmation_code=confirmation_code,
-                    event_name=registration.event.name,
-                )
+def _limit_confirmations(request):
+    """
+    Limit confirm requests per staff user, codes cannot be enumerated fast
+    """
+    limiter = get_limiter("confirm", "EVENTS_CONFIRM_RATE", (120, 60))
+    retry_after = limiter and limiter.consume(request.user.pk)
+    if retry_after:
+        return too_many_requests(retry_after, "Too many confirmation requests")
+    return None
 
-            return Response(
-                {
-                    "message": "Registration created successfully",
-                    "registration_id": str(registration.id),
-                    "confirmation_code": confirmation_code,
-                    "email_sent": email_sent,
-                },
-                status=status.HTTP_201_CREATED,
-            )
 
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def confirm_registration(request, event_id):
+    """
+    Staff-only check-in endpoint confirming a registration by its code
+    """
+    limited = _limit_confirmations(request)
+    if limited is not None:
+        return limited
+
+    serializer = RegistrationConfirmSerializer(data=request.data)
+
+    if not serializer.is_valid():
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        RegistrationService().confirm(
+            event_id, serializer.validated_data["confirmation_code"]
+        )
+    except RegistrationError as e:
+        return Response(
+            {"errors": {e.field: [str(e)]}}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({"message": "Registration confirmed"})
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def confirm_registrations_batch(request, event_id):
+    """
+    Staff-only endpoint for confirming many registrations at once at check-in
+    """
+    limited = _limit_confirmations(request)
+    if limited is not None:
+        return limited
+
+    serializer = RegistrationBatchConfirmSerializer(data=request.data)
+
+    if not serializer.is_valid():
+        return Response(
+            {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result = RegistrationService().confirm_batch(
+        event_id, serializer.validated_data["confirmation_codes"]
+    )
+    return Response(result)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_registrations(request, event_id):
+    """
+    Staff-only endpoint for streaming the attendee list of an event
+    Supports `output=ndjson|csv` and `confirmed_only`
+    Confirmation codes are never exported
+    """
+    query = RegistrationExportQuerySerializer(data=request.query_params)
+
+    if not query.is_valid():
+        return Response({"errors": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not Event.objects.filter(id=event_id).exists():
+        return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    params = query.validated_data
+    output = params["output"]
+    # Ordered by email to walk the (event, email) index
+    registrations = EventRegistration.objects.filter(event_id=event_id).order_by(
+        "email"
+    )
+
+    if params["confirmed_only"]:
+        registrations = registrations.filter(is_confirmed=True)
+
+    response = StreamingHttpResponse(
+        stream_export(registrations, REGISTRATION_EXPORT_COLUMNS, output),
+        content_type=EXPORT_CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="registrations-{event_id}.{output}"'
+    )
+
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def import_registrations(request, event_id):
+    """
+    Staff-only endpoint for importing event registrations from a CSV
+    attendee list, every imported address gets a confirmation email
+    Expects multipart `file` with full_name and email columns
+    """
+    upload = request.FILES.get("file")
+
+    if upload is None:
+        return Response(
+            {"errors": {"file": ["No file was submitted"]}},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to disk, the
+    # wrapper decodes them lazily so the file is never held in memory.
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+    try:
+        summary = RegistrationImportService().import_csv(event_id, stream)
+    except RegistrationError as e:
+        return Response(
+            {"errors": {e.field: [str(e)]}}, status=status.HTTP_400_BAD_REQUEST
+        )
+    except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+        return Response(
+            {"errors": {"file": [str(e)]}}, status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception:
         return Response(
-            {"error": "An error occurred during registration"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            {"error": "Failed to import registrations"},
+            status=status.HTTP_400_BAD_REQUEST,
         )
+
+    return Response(summary)
@@ -0,0 +1,63 @@
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from src.events.notification_dispatcher import NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run notification dispatcher for queued emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of messages to process in one batch",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Sleep interval when the queue is empty in seconds",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Number of emails sent in parallel",
+        )
+        parser.add_argument(
+            "--bulk-size",
+            type=int,
+            default=100,
+            help="Emails per call when NOTIFICATION_BULK_PATH is configured",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Starting notification dispatcher...")
+
+        dispatcher = NotificationDispatcher(
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            bulk_size=options["bulk_size"],
+            poll_interval=options["poll_interval"],
+        )
+
+        def signal_handler(signum, frame):
+            self.stdout.write("Received shutdown signal...")
+            dispatcher.stop()
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+
+        try:
+            dispatcher.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Notification dispatcher stopped by user")
+        except Exception as e:
+            logger.error("Notification dispatcher error: %s", e)
+            raise
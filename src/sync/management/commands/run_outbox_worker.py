@@ -3,7 +3,8 @@ import signal
 
 from django.core.management.base import BaseCommand
 
-from src.sync.outbox_services import MockMessageProducer
+from src.sync.outbox_pool import OutboxWorkerPool
+from src.sync.outbox_services import EVENTS_TOPIC, MockMessageProducer
 from src.sync.outbox_worker import OutboxWorker
 
 logger = logging.getLogger(__name__)
@@ -23,17 +24,46 @@ class Command(BaseCommand):
             "--poll-interval",
             type=float,
             default=1.0,
-            help="Sleep interval between batches in seconds",
+            help="Seconds to wait for a new message notification before polling",
+        )
+        parser.add_argument(
+            "--topic",
+            action="append",
+            dest="topics",
+            help=f"Topic to process (can be repeated, default: {EVENTS_TOPIC})",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes, messages are partitioned by event",
+        )
+        parser.add_argument(
+            "--report-interval",
+            type=float,
+            default=30.0,
+            help="Seconds between per-partition throughput reports of the pool",
         )
 
     def handle(self, *args, **options):
-        self.stdout.write("Starting outbox worker...")
-
-        worker = OutboxWorker(
-            producer=MockMessageProducer(),
-            batch_size=options["batch_size"],
-            poll_interval=options["poll_interval"],
-        )
+        if options["workers"] > 1:
+            self.stdout.write(f"Starting {options['workers']} outbox workers...")
+            worker = OutboxWorkerPool(
+                workers=options["workers"],
+                producer_factory=MockMessageProducer,
+                batch_size=options["batch_size"],
+                poll_interval=options["poll_interval"],
+                topics=options["topics"] or [EVENTS_TOPIC],
+                report_interval=options["report_interval"],
+            )
+        else:
+            self.stdout.write("Starting outbox worker...")
+            worker = OutboxWorker(
+                producer=MockMessageProducer(),
+                batch_size=options["batch_size"],
+                poll_interval=options["poll_interval"],
+                topics=options["topics"] or [EVENTS_TOPIC],
+            )
 
         def signal_handler(signum, frame):
             self.stdout.write("Received shutdown signal...")
@@ -43,7 +73,10 @@ class Command(BaseCommand):
         signal.signal(signal.SIGTERM, signal_handler)
 
         try:
-            worker.process_outbox()
+            if options["workers"] > 1:
+                worker.run()
+            else:
+                worker.process_outbox()
         except KeyboardInterrupt:
             self.stdout.write("Outbox worker stopped by user")
         except Exception as e:
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from src.sync.reports import publish_circuit_breakers
 from src.sync.services import SyncService
 
 
@@ -25,6 +26,9 @@ class Command(BaseCommand):
             self.stdout.write("Performing incremental synchronization...")
             result = sync_service.perform_sync(full_sync=False)
 
+        # The events-provider breaker lives in this process only
+        publish_circuit_breakers("sync_events")
+
         if result.is_success:
             self.stdout.write(
                 self.style.SUCCESS(
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync", "0005_outboxmessage_error_message_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="claimed_by",
+            field=models.CharField(
+                blank=True, default="", max_length=255, verbose_name="Claimed By"
+            ),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="lease_until",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Lease Until"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:09
+
+import zlib
+
+from django.db import migrations, models
+
+
+def backfill_partition_key(apps, schema_editor):
+    OutboxMessage = apps.get_model("sync", "OutboxMessage")
+
+    messages = list(OutboxMessage.objects.filter(sent=False).only("id", "payload"))
+    for message in messages:
+        key = message.payload.get("event_id") or message.id
+        message.partition_key = zlib.crc32(str(key).encode()) & 0x7FFFFFFF
+    OutboxMessage.objects.bulk_update(messages, ["partition_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync", "0006_outboxmessage_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="partition_key",
+            field=models.PositiveIntegerField(default=0, verbose_name="Partition Key"),
+        ),
+        migrations.RunPython(backfill_partition_key, migrations.RunPython.noop),
+    ]
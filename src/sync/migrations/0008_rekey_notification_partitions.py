@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+import zlib
+
+from django.db import migrations
+
+
+def rekey_notifications(apps, schema_editor):
+    """
+    Key queued notifications by recipient instead of event
+
+    0007 keyed every message by event, emails only need to stay in order
+    per recipient. Sent messages are never claimed again and keep their key.
+    """
+    OutboxMessage = apps.get_model("sync", "OutboxMessage")
+
+    messages = list(
+        OutboxMessage.objects.filter(topic="notifications", sent=False).only(
+            "id", "payload"
+        )
+    )
+    for message in messages:
+        key = message.payload.get("email") or message.id
+        message.partition_key = zlib.crc32(str(key).encode()) & 0x7FFFFFFF
+    OutboxMessage.objects.bulk_update(messages, ["partition_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync", "0007_outboxmessage_partition_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_notifications, migrations.RunPython.noop),
+    ]
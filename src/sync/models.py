@@ -55,6 +55,13 @@ class OutboxMessage(models.Model):
         null=True, blank=True, verbose_name="Last Retry At"
     )
     error_message = models.TextField(blank=True, verbose_name="Error Message")
+    claimed_by = models.CharField(
+        max_length=255, blank=True, default="", verbose_name="Claimed By"
+    )
+    lease_until = models.DateTimeField(
+        null=True, blank=True, verbose_name="Lease Until"
+    )
+    partition_key = models.PositiveIntegerField(default=0, verbose_name="Partition Key")
 
     class Meta:
         verbose_name = "Outbox Message"
@@ -0,0 +1,81 @@
+import logging
+import select
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CHANNEL = "outbox_messages"
+
+
+def notify_outbox(topic):
+    """
+    Wake outbox consumers of a topic once the current transaction commits
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    def send():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [OUTBOX_CHANNEL, topic])
+
+    transaction.on_commit(send)
+
+
+class OutboxListener:
+    """
+    LISTEN on the outbox channel over a dedicated database connection
+
+    The connection is opened lazily and reopened after errors. Callers
+    still poll when `wait` times out, so a lost notification only delays
+    delivery by one timeout.
+    """
+
+    def __init__(self, topics=None, alias=DEFAULT_DB_ALIAS):
+        self.topics = set(topics) if topics else None
+        self.alias = alias
+        self._connection = None
+
+    def wait(self, timeout):
+        """
+        Block until a message of our topics is queued or timeout seconds
+        pass, return True when woken by a notification
+        """
+        if connections[self.alias].vendor != "postgresql":
+            time.sleep(timeout)
+            return False
+
+        try:
+            raw = self._get_connection()
+            if self._drain(raw):
+                return True
+
+            if select.select([raw], [], [], timeout)[0]:
+                raw.poll()
+                return self._drain(raw)
+            return False
+        except Exception as e:
+            logger.warning("Outbox listener failed, falling back to polling: %s", e)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get_connection(self):
+        if self._connection is None:
+            self._connection = connections.create_connection(self.alias)
+            self._connection.ensure_connection()
+            self._connection.set_autocommit(True)
+            with self._connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{OUTBOX_CHANNEL}"')
+        return self._connection.connection
+
+    def _drain(self, raw):
+        notified = {notify.payload for notify in raw.notifies}
+        raw.notifies.clear()
+        return bool(notified) and (self.topics is None or bool(notified & self.topics))
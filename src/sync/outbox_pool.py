@@ -0,0 +1,210 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.db import connections
+
+from .outbox_services import MockMessageProducer
+from .outbox_worker import OutboxWorker
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionWorker(OutboxWorker):
+    """
+    OutboxWorker that adds its batch results to counters shared with the pool
+    """
+
+    def __init__(self, sent_counters, failed_counters, **kwargs):
+        super().__init__(**kwargs)
+        self.sent_counters = sent_counters
+        self.failed_counters = failed_counters
+
+    def _process_batch(self):
+        processed_count, failed_count = super()._process_batch()
+        self.sent_counters[self.partition] += processed_count
+        self.failed_counters[self.partition] += failed_count
+        return processed_count, failed_count
+
+
+def run_partition_worker(partition, partitions, worker_id, options, counters):
+    """
+    Entry point of a worker process
+    """
+    worker = PartitionWorker(
+        *counters,
+        producer=options["producer_factory"](),
+        batch_size=options["batch_size"],
+        poll_interval=options["poll_interval"],
+        topics=options["topics"],
+        partition=partition,
+        partitions=partitions,
+        worker_id=worker_id,
+        retry_backoff=options["retry_backoff"],
+    )
+
+    def signal_handler(signum, frame):
+        worker.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    try:
+        worker.process_outbox()
+    finally:
+        connections.close_all()
+
+
+class OutboxWorkerPool:
+    """
+    Supervisor running one OutboxWorker process per partition
+
+    Messages are spread over partitions by `partition_key`, so all messages
+    of an event go through one worker and keep their order while different
+    events are sent in parallel. Each worker holds a session advisory lock
+    on its partition, so a second pool, an overlapping restart or a pool
+    with another number of workers waits instead of sending out of order.
+    A worker process that exits is restarted with the same worker id, which
+    lets it take over its leased messages as soon as it holds the lock.
+    Per-partition throughput is logged every `report_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        workers,
+        producer_factory=MockMessageProducer,
+        batch_size=100,
+        poll_interval=1,
+        topics=None,
+        report_interval=30,
+        restart_delay=1,
+        retry_backoff=None,
+    ):
+        self.workers = workers
+        self.options = {
+            "producer_factory": producer_factory,
+            "batch_size": batch_size,
+            "poll_interval": poll_interval,
+            "topics": topics,
+            "retry_backoff": retry_backoff,
+        }
+        self.report_interval = report_interval
+        self.restart_delay = restart_delay
+        self.context = multiprocessing.get_context("fork")
+        self.sent_counters = self.context.Array("q", workers, lock=False)
+        self.failed_counters = self.context.Array("q", workers, lock=False)
+        self.processes = {}
+        self.restarts = [0] * workers
+        self.running = False
+        self._pool_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._last_report = (time.monotonic(), [0] * workers)
+
+    def run(self):
+        """
+        Start the workers and supervise them until stopped
+        """
+        self.running = True
+        logger.info(
+            "Outbox worker pool started - Workers: %s, Topics: %s",
+            self.workers,
+            ", ".join(self.options["topics"]) if self.options["topics"] else "all",
+        )
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        for partition in range(self.workers):
+            self._start(partition)
+
+        try:
+            while self.running:
+                time.sleep(self.restart_delay)
+                self._restart_exited()
+                if time.monotonic() - self._last_report[0] >= self.report_interval:
+                    self.report()
+        finally:
+            self._shutdown()
+
+    def stop(self):
+        self.running = False
+        logger.info("Outbox worker pool stopping")
+
+    def report(self):
+        """
+        Log and return throughput per partition since the previous report
+        """
+        now = time.monotonic()
+        reported_at, last_sent = self._last_report
+        elapsed = max(now - reported_at, 1e-9)
+        sent = list(self.sent_counters)
+
+        stats = []
+        for partition in range(self.workers):
+            process = self.processes.get(partition)
+            stats.append(
+                {
+                    "partition": partition,
+                    "alive": bool(process and process.is_alive()),
+                    "restarts": self.restarts[partition],
+                    "sent_total": sent[partition],
+                    "failed_total": self.failed_counters[partition],
+                    "messages_per_second": round(
+                        (sent[partition] - last_sent[partition]) / elapsed, 1
+                    ),
+                }
+            )
+            logger.info(
+                "Partition %s - %.1f msg/s, sent: %s, failed: %s, restarts: %s",
+                partition,
+                stats[-1]["messages_per_second"],
+                stats[-1]["sent_total"],
+                stats[-1]["failed_total"],
+                stats[-1]["restarts"],
+            )
+
+        self._last_report = (now, sent)
+        return stats
+
+    def _start(self, partition):
+        process = self.context.Process(
+            target=run_partition_worker,
+            args=(
+                partition,
+                self.workers,
+                f"{self._pool_id}:partition-{partition}/{self.workers}",
+                self.options,
+                (self.sent_counters, self.failed_counters),
+            ),
+            name=f"outbox-worker-{partition}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[partition] = process
+
+    def _restart_exited(self):
+        for partition, process in self.processes.items():
+            if process.is_alive() or not self.running:
+                continue
+
+            self.restarts[partition] += 1
+            logger.warning(
+                "Outbox worker %s exited with code %s, restarting (restart %s)",
+                partition,
+                process.exitcode,
+                self.restarts[partition],
+            )
+            self._start(partition)
+
+    def _shutdown(self, timeout=10):
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+        logger.info("Outbox worker pool stopped")
@@ -1,12 +1,113 @@
 import logging
+import os
+import socket
+import threading
+import time
 import uuid
+import zlib
+from datetime import timedelta
 
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F
+from django.db.models.functions import Now
 from django.utils import timezone
 
 from .models import OutboxMessage
+from .outbox_listener import notify_outbox
 
 logger = logging.getLogger(__name__)
 
+EVENTS_TOPIC = "events"
+NOTIFICATIONS_TOPIC = "notifications"
+MAX_RETRIES = 3
+PARTITION_KEY_FIELD = "event_id"
+# Emails only need to stay in order per recipient
+TOPIC_PARTITION_KEY_FIELDS = {NOTIFICATIONS_TOPIC: "email"}
+
+# A failed message is retried after `backoff * 2 ^ retry_count` seconds.
+# Until then later messages of its topic with its partition key are not
+# claimed either, so they cannot overtake it. The backing off keys are
+# collected once per claim, a correlated subquery per pending row is far
+# slower on a backlog.
+CLAIM_SQL = """
+    WITH backing_off AS (
+        SELECT topic, partition_key, MIN(created_at) AS created_at FROM {table}
+        WHERE sent = false AND retry_count < %s
+            AND last_retry_at >= NOW()
+                - make_interval(secs => %s * power(2, retry_count))
+        GROUP BY topic, partition_key
+    )
+    UPDATE {table} SET claimed_by = %s,
+        lease_until = NOW() + make_interval(secs => %s)
+    WHERE id IN (
+        SELECT id FROM {table} AS pending
+        WHERE sent = false AND retry_count < %s
+            AND (lease_until IS NULL OR lease_until < NOW(){own_leases})
+            AND NOT EXISTS (
+                SELECT 1 FROM backing_off
+                WHERE backing_off.topic = pending.topic
+                    AND backing_off.partition_key = pending.partition_key
+                    AND backing_off.created_at <= pending.created_at
+            )
+            {filters}
+        ORDER BY created_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *
+"""
+
+# Advisory lock keys of partition workers are this namespace in the high 32
+# bits and `partitions << 16 | partition` in the low 32 bits
+PARTITION_LOCK_NAMESPACE = zlib.crc32(b"outbox-partition") & 0x7FFFFFFF
+
+# Whether workers of another number of partitions hold locks, objid 0 is
+# the key serializing these checks
+OTHER_PARTITION_LAYOUT_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_locks
+        WHERE locktype = 'advisory' AND granted AND objsubid = 1
+            AND classid = %s AND objid::bigint / 65536 NOT IN (0, %s)
+    ), pg_backend_pid()
+"""
+
+PARTITION_LOCK_HELD_FILTER = """
+    AND EXISTS (
+        SELECT 1 FROM pg_locks
+        WHERE locktype = 'advisory' AND granted AND objsubid = 1
+            AND classid = %s AND objid = %s AND pid = %s
+    )
+"""
+
+
+def get_worker_id():
+    """
+    Identity of an outbox consumer written to claimed messages
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def get_partition_key(payload, message_id, topic=None):
+    """
+    Stable hash of the aggregate a message belongs to
+
+    Messages of one event share a key and therefore a worker partition,
+    messages without an event are keyed by their own id. Notifications
+    are keyed by recipient instead.
+    """
+    field = TOPIC_PARTITION_KEY_FIELDS.get(topic, PARTITION_KEY_FIELD)
+    key = payload.get(field) or message_id
+    return zlib.crc32(str(key).encode()) & 0x7FFFFFFF
+
+
+def get_lease_seconds():
+    return getattr(settings, "OUTBOX_LEASE_SECONDS", 60)
+
+
+def get_retry_backoff():
+    return getattr(settings, "OUTBOX_RETRY_BACKOFF_SECONDS", 5)
+
 
 class OutboxService:
     """
@@ -17,17 +118,45 @@ class OutboxService:
         """
         Create message in outbox
         """
+        message_id = uuid.uuid4()
         message = OutboxMessage.objects.create(
-            id=uuid.uuid4(), topic=topic, payload=payload, sent=False
+            id=message_id,
+            topic=topic,
+            payload=payload,
+            partition_key=get_partition_key(payload, message_id, topic),
+            sent=False,
         )
+        notify_outbox(topic)
         logger.debug("Created outbox message %s", message.id)
         return message
 
-    def create_event_created_message(self, event):
+    def create_messages(self, topic, payloads):
         """
-        Create message for event creation
+        Create several messages in outbox with one INSERT
+        """
+        messages = []
+        for payload in payloads:
+            message_id = uuid.uuid4()
+            messages.append(
+                OutboxMessage(
+                    id=message_id,
+                    topic=topic,
+                    payload=payload,
+                    partition_key=get_partition_key(payload, message_id, topic),
+                    sent=False,
+                )
+            )
+        messages = OutboxMessage.objects.bulk_create(messages)
+        if messages:
+            notify_outbox(topic)
+        logger.debug("Created %s outbox messages", len(messages))
+        return messages
+
+    def build_event_created_payload(self, event):
         """
-        payload = {
+        Build message payload for event creation
+        """
+        return {
             "message_id": str(uuid.uuid4()),
             "event_id": str(event.id),
             "event_name": event.name,
@@ -39,15 +168,11 @@ class OutboxService:
             "action": "event_created",
         }
 
-        message = self.create_message("events", payload)
-        logger.info("Created event_created message for event %s", event.id)
-        return message
-
-    def create_event_updated_message(self, event):
+    def build_event_updated_payload(self, event):
         """
-        Create message for event update
+        Build message payload for event update
         """
-        payload = {
+        return {
             "message_id": str(uuid.uuid4()),
             "event_id": str(event.id),
             "event_name": event.name,
@@ -59,10 +184,181 @@ class OutboxService:
             "action": "event_updated",
         }
 
-        message = self.create_message("events", payload)
+    def create_event_created_message(self, event):
+        """
+        Create message for event creation
+        """
+        payload = self.build_event_created_payload(event)
+        message = self.create_message(EVENTS_TOPIC, payload)
+        logger.info("Created event_created message for event %s", event.id)
+        return message
+
+    def create_event_updated_message(self, event):
+        """
+        Create message for event update
+        """
+        payload = self.build_event_updated_payload(event)
+        message = self.create_message(EVENTS_TOPIC, payload)
         logger.info("Created event_updated message for event %s", event.id)
         return message
 
+    def create_event_messages(self, created_events=(), updated_events=()):
+        """
+        Create messages for created and updated events with one INSERT
+        """
+        payloads = [self.build_event_created_payload(e) for e in created_events]
+        payloads += [self.build_event_updated_payload(e) for e in updated_events]
+        messages = self.create_messages(EVENTS_TOPIC, payloads)
+        logger.info("Created %s event messages", len(messages))
+        return messages
+
+    def build_confirmation_email_payload(self, registration):
+        """
+        Build message payload for registration confirmation email
+
+        The event name is resolved at send time to keep the registration
+        path free of reads.
+        """
+        return {
+            "message_id": str(uuid.uuid4()),
+            "registration_id": str(registration.id),
+            "event_id": str(registration.event_id),
+            "email": registration.email,
+            "full_name": registration.full_name,
+            "confirmation_code": registration.confirmation_code,
+            "action": "confirmation_email",
+        }
+
+    def create_confirmation_email_message(self, registration):
+        """
+        Queue registration confirmation email for the notification dispatcher
+        """
+        payload = self.build_confirmation_email_payload(registration)
+        message = self.create_message(NOTIFICATIONS_TOPIC, payload)
+        logger.info("Queued confirmation email for registration %s", registration.id)
+        return message
+
+    def create_confirmation_email_messages(self, registrations):
+        """
+        Queue confirmation emails for many registrations with one INSERT
+        """
+        messages = self.create_messages(
+            NOTIFICATIONS_TOPIC,
+            [self.build_confirmation_email_payload(r) for r in registrations],
+        )
+        logger.info("Queued %s confirmation emails", len(messages))
+        return messages
+
+    def claim_messages(
+        self,
+        worker_id,
+        batch_size,
+        topics=None,
+        lease_seconds=None,
+        partition=None,
+        partitions=1,
+        retry_backoff=None,
+        partition_lock=None,
+    ):
+        """
+        Lease pending messages to a worker with one UPDATE ... RETURNING
+
+        The statement commits on its own, so sending needs no open
+        transaction. Messages of a worker that dies are claimed again once
+        their lease runs out. Failed messages wait out an exponential
+        backoff of `retry_backoff` seconds before they are claimed again.
+        With `partition` set only messages whose partition key falls into
+        that of `partitions` buckets are claimed.
+
+        With a held `partition_lock` nothing is claimed unless its session
+        still holds the lock, and the worker takes over messages leased
+        under its own id right away: only a restart of the same partition
+        worker can have left them.
+        """
+        if retry_backoff is None:
+            retry_backoff = get_retry_backoff()
+        params = [
+            MAX_RETRIES,
+            retry_backoff,
+            worker_id,
+            lease_seconds or get_lease_seconds(),
+            MAX_RETRIES,
+        ]
+        own_leases = ""
+        if partition_lock is not None:
+            own_leases = " OR claimed_by = %s"
+            params.append(worker_id)
+
+        filters = ""
+        if topics:
+            filters += "AND topic = ANY(%s) "
+            params.append(list(topics))
+        if partition is not None:
+            filters += "AND partition_key %% %s = %s "
+            params += [partitions, partition]
+        if partition_lock is not None:
+            filters += PARTITION_LOCK_HELD_FILTER
+            params += [
+                PARTITION_LOCK_NAMESPACE,
+                partition_lock.key & 0xFFFFFFFF,
+                partition_lock.pid,
+            ]
+        params.append(batch_size)
+
+        sql = CLAIM_SQL.format(
+            table=OutboxMessage._meta.db_table, own_leases=own_leases, filters=filters
+        )
+        messages = list(OutboxMessage.objects.raw(sql, params))
+        return sorted(messages, key=lambda message: message.created_at)
+
+    def mark_sent(self, worker_id, message_ids):
+        """
+        Mark messages leased to the worker as sent and end their lease
+
+        Every result write is fenced on `claimed_by`: a message whose lease
+        ran out and was claimed by another worker is left to that worker.
+        Returns the number of messages written.
+        """
+        return self._leased(worker_id, message_ids).update(
+            sent=True, sent_at=timezone.now(), claimed_by="", lease_until=None
+        )
+
+    def mark_failed(self, worker_id, message_ids, error_message=None):
+        """
+        Count a failed attempt of messages leased to the worker
+        """
+        fields = {}
+        if error_message is not None:
+            fields["error_message"] = error_message
+        return self._leased(worker_id, message_ids).update(
+            retry_count=F("retry_count") + 1,
+            last_retry_at=timezone.now(),
+            claimed_by="",
+            lease_until=None,
+            **fields,
+        )
+
+    def release_messages(self, worker_id, message_ids):
+        """
+        Give messages leased to the worker back without counting an attempt
+        """
+        return self._leased(worker_id, message_ids).update(
+            claimed_by="", lease_until=None
+        )
+
+    def renew_leases(self, worker_id, message_ids, lease_seconds):
+        """
+        Extend the lease of messages still held by the worker
+        """
+        return self._leased(worker_id, message_ids).update(
+            lease_until=Now() + timedelta(seconds=lease_seconds)
+        )
+
+    def _leased(self, worker_id, message_ids):
+        return OutboxMessage.objects.filter(
+            id__in=message_ids, claimed_by=worker_id, sent=False
+        )
+
     def _safe_isoformat(self, date_value):
         """
         Safely convert date to ISO format string
@@ -126,7 +422,192 @@ class OutboxService:
         }
 
 
-class MockMessageProducer:
+class LeaseRenewer:
+    """
+    Keep extending the lease of claimed messages while they are being sent
+
+    A thread renews the lease every third of `lease_seconds`, so a batch
+    that outlasts its lease because the broker is slow is not claimed by
+    another worker. Batches shorter than that never open the thread's
+    database connection.
+    """
+
+    def __init__(self, outbox, worker_id, message_ids, lease_seconds):
+        self.outbox = outbox
+        self.worker_id = worker_id
+        self.message_ids = list(message_ids)
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        if self.message_ids:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.lease_seconds / 3):
+                renewed = self.outbox.renew_leases(
+                    self.worker_id, self.message_ids, self.lease_seconds
+                )
+                logger.debug("Renewed lease of %s outbox messages", renewed)
+        except Exception as e:
+            logger.error("Failed to renew outbox leases: %s", e)
+        finally:
+            connection.close()
+
+
+class PartitionLock:
+    """
+    Session advisory lock giving one worker a partition of `partitions`
+
+    Per-event ordering needs exactly one worker per partition. The lock is
+    held on a dedicated connection for the worker's lifetime, so a second
+    pool or a supervisor restart that overlaps the old process waits for
+    it. A pool with a different number of partitions waits until no worker
+    of another layout holds a lock, its buckets would overlap. The lock is
+    lost with its connection, `check` notices and `acquire` takes it again.
+    """
+
+    def __init__(self, partition, partitions, alias=DEFAULT_DB_ALIAS):
+        self.partition = partition
+        self.partitions = partitions
+        self.alias = alias
+        self.key = (PARTITION_LOCK_NAMESPACE << 32) | (partitions << 16) | partition
+        self.pid = None
+        self._connection = None
+
+    @property
+    def held(self):
+        return self.pid is not None
+
+    def acquire(self):
+        """
+        Try to take the lock without blocking, return True if held
+        """
+        if self.held:
+            return True
+
+        try:
+            with self._get_connection().cursor() as cursor:
+                # Layout checks are serialized by a transaction lock, so two
+                # pools of different sizes cannot both pass them
+                cursor.execute("BEGIN")
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", [PARTITION_LOCK_NAMESPACE << 32]
+                )
+                cursor.execute(
+                    OTHER_PARTITION_LAYOUT_SQL,
+                    [PARTITION_LOCK_NAMESPACE, self.partitions],
+                )
+                other_layout, pid = cursor.fetchone()
+                locked = False
+                if not other_layout:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.key])
+                    locked = cursor.fetchone()[0]
+                cursor.execute("COMMIT")
+        except Exception as e:
+            logger.warning("Failed to lock outbox partition: %s", e)
+            self.close()
+            return False
+
+        if locked:
+            self.pid = pid
+            logger.info(
+                "Locked outbox partition %s/%s", self.partition, self.partitions
+            )
+        return locked
+
+    def check(self):
+        """
+        Drop the lock if its connection is gone
+        """
+        if not self.held:
+            return
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Exception as e:
+            logger.warning("Lost lock of outbox partition %s: %s", self.partition, e)
+            self.close()
+
+    def close(self):
+        self.pid = None
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _get_connection(self):
+        if self._connection is None:
+            self._connection = connections.create_connection(self.alias)
+            self._connection.ensure_connection()
+            self._connection.set_autocommit(True)
+        return self._connection
+
+
+def send_each(producer, messages):
+    """
+    Send outbox messages one by one with `producer.send_message`
+
+    Once a message fails, later messages with the same partition key are
+    not attempted, so they cannot overtake it.
+    """
+    results = []
+    failed_keys = set()
+
+    for message in messages:
+        if message.partition_key in failed_keys:
+            results.append(None)
+            continue
+
+        try:
+            result = bool(producer.send_message(message.topic, message.payload))
+        except Exception as e:
+            result = e
+
+        if result is not True:
+            failed_keys.add(message.partition_key)
+        results.append(result)
+
+    return results
+
+
+class BaseMessageProducer:
+    """
+    Interface of producers delivering outbox messages to a broker
+
+    Producers implement `send_message`. Clients that can publish many
+    messages per round trip override `send_batch` as well.
+    """
+
+    def send_message(self, topic, payload):
+        """
+        Send one message, return True when the broker accepted it
+        """
+        raise NotImplementedError
+
+    def send_batch(self, messages):
+        """
+        Send outbox messages in `created_at` order, return one result each
+
+        A result is True when the message was delivered, False or the raised
+        exception when it failed and None when it was not attempted. A
+        message must not be delivered after an earlier failed message with
+        the same partition key. Sends messages one by one by default.
+        """
+        return send_each(self, messages)
+
+
+class MockMessageProducer(BaseMessageProducer):
     """
     Mock producer for message sending (instead of real Kafka/RabbitMQ)
     """
@@ -137,3 +618,33 @@ class MockMessageProducer:
         """
         logger.info("Message would be sent to '%s': %s", topic, payload)
         return True
+
+
+class FakeBrokerProducer(BaseMessageProducer):
+    """
+    Producer simulating a remote broker for local benchmarks
+
+    Every call waits one round trip of `latency` seconds plus
+    `per_message_latency` per message, a batch is published in a single
+    round trip. With `batching` off, batches fall back to one call per
+    message.
+    """
+
+    def __init__(self, latency=0.005, per_message_latency=0.0, batching=True):
+        self.latency = latency
+        self.per_message_latency = per_message_latency
+        self.batching = batching
+        self.calls = 0
+
+    def send_message(self, topic, payload):
+        self.calls += 1
+        time.sleep(self.latency + self.per_message_latency)
+        return True
+
+    def send_batch(self, messages):
+        if not self.batching:
+            return super().send_batch(messages)
+
+        self.calls += 1
+        time.sleep(self.latency + self.per_message_latency * len(messages))
+        return [True] * len(messages)
@@ -1,11 +1,16 @@
 import logging
 import time
 
-from django.db import transaction
-from django.utils import timezone
-
-from .models import OutboxMessage
-from .outbox_services import MockMessageProducer
+from .outbox_listener import OutboxListener
+from .outbox_services import (
+    LeaseRenewer,
+    MockMessageProducer,
+    OutboxService,
+    PartitionLock,
+    get_lease_seconds,
+    get_worker_id,
+    send_each,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,12 +18,52 @@ logger = logging.getLogger(__name__)
 class OutboxWorker:
     """
     Worker for processing outbox messages
+
+    Messages are leased with a short claim statement and sent with no open
+    transaction, so a slow broker never holds row locks. The lease is
+    renewed while the batch is being sent and every result is written only
+    if this worker still holds the lease.
+
+    The worker drains the queue back to back while batches come back
+    non-empty, then sleeps on LISTEN until a new message is committed.
+    `poll_interval` only bounds that sleep in case a notification is lost.
+
+    The claimed batch is handed to the producer's `send_batch`, producers
+    without one get a message at a time. Messages are sent in `created_at`
+    order. Once a send fails, later messages with the same partition key
+    are put back and are not claimed again before the failed message, which
+    waits out the retry backoff, so messages of one event never overtake
+    each other. With `partition` set the worker only handles that bucket of
+    `partitions` and only while it holds the partition's advisory lock, see
+    OutboxWorkerPool.
     """
 
-    def __init__(self, producer=None, batch_size=100, poll_interval=1):
+    def __init__(
+        self,
+        producer=None,
+        batch_size=100,
+        poll_interval=1,
+        topics=None,
+        lease_seconds=None,
+        partition=None,
+        partitions=1,
+        worker_id=None,
+        retry_backoff=None,
+    ):
         self.producer = producer or MockMessageProducer()
         self.batch_size = batch_size
         self.poll_interval = poll_interval
+        self.topics = topics
+        self.lease_seconds = lease_seconds or get_lease_seconds()
+        self.partition = partition
+        self.partitions = partitions
+        self.worker_id = worker_id or get_worker_id()
+        self.retry_backoff = retry_backoff
+        self.partition_lock = (
+            PartitionLock(partition, partitions) if partition is not None else None
+        )
+        self.outbox = OutboxService()
+        self.listener = OutboxListener(topics)
         self.running = False
         self.processed_total = 0
 
@@ -27,21 +72,28 @@ class OutboxWorker:
         Main outbox processing method
         """
         self.running = True
-        logger.info("Outbox worker started")
+        logger.info("Outbox worker %s started", self.worker_id)
         logger.info(
-            "Configuration - Batch size: %s, Poll interval: %ss",
+            "Configuration - Batch size: %s, Poll interval: %ss, Topics: %s",
             self.batch_size,
             self.poll_interval,
+            ", ".join(self.topics) if self.topics else "all",
         )
 
-        while self.running:
-            try:
-                processed_count, failed_count = self._process_batch()
+        try:
+            while self.running:
+                try:
+                    processed_count, failed_count = self._process_batch()
+
+                    if processed_count == 0 and failed_count == 0:
+                        if self.partition_lock and not self.partition_lock.held:
+                            # Another worker owns the partition
+                            time.sleep(self.poll_interval)
+                            continue
+                        logger.debug("No messages to process")
+                        self.listener.wait(self.poll_interval)
+                        continue
 
-                if processed_count == 0 and failed_count == 0:
-                    logger.debug("No messages to process")
-                    time.sleep(self.poll_interval)
-                else:
                     self.processed_total += processed_count
                     logger.info(
                         "Batch processed - Success: %s, Failed: %s, Total: %s",
@@ -49,64 +101,135 @@ class OutboxWorker:
                         failed_count,
                         self.processed_total,
                     )
-                    time.sleep(1)
+                    if processed_count == 0:
+                        # Nothing got through, give the broker a moment
+                        # before retrying. Not the listener: it returns at
+                        # once while new messages keep arriving.
+                        time.sleep(self.poll_interval)
 
-            except Exception as e:
-                logger.error("Error in outbox worker main loop: %s", e)
-                time.sleep(10)
+                except Exception as e:
+                    logger.error("Error in outbox worker main loop: %s", e)
+                    time.sleep(10)
+        finally:
+            self.listener.close()
+            if self.partition_lock:
+                self.partition_lock.close()
 
     def _process_batch(self):
         """
-        Process batch of messages with transaction and locking
+        Claim a batch of messages and send it outside any transaction
+
+        A partition worker only claims while it holds the partition lock.
         """
-        with transaction.atomic():
-            messages = (
-                OutboxMessage.objects.filter(sent=False, retry_count__lt=3)
-                .select_for_update(skip_locked=True)
-                .order_by("created_at")[: self.batch_size]
-            )
+        if self.partition_lock and not self.partition_lock.acquire():
+            return 0, 0
 
-            logger.debug("Found %s messages to process", len(messages))
+        messages = self.outbox.claim_messages(
+            self.worker_id,
+            self.batch_size,
+            self.topics,
+            self.lease_seconds,
+            self.partition,
+            self.partitions,
+            self.retry_backoff,
+            self.partition_lock,
+        )
+        if not messages and self.partition_lock:
+            # An empty claim may mean the lock's connection was lost
+            self.partition_lock.check()
+
+        logger.debug("Claimed %s messages to process", len(messages))
+
+        sent_ids = []
+        failed_messages = []
+        held_ids = []
+
+        with LeaseRenewer(
+            self.outbox, self.worker_id, [m.id for m in messages], self.lease_seconds
+        ):
+            results = self._send(messages)
+
+        for message, result in zip(messages, results):
+            if result is None:
+                held_ids.append(message.id)
+            elif isinstance(result, Exception):
+                logger.error("Error processing message %s: %s", message.id, result)
+                message.retry_count += 1
+                message.error_message = str(result)
+                failed_messages.append(message)
+            elif result:
+                sent_ids.append(message.id)
+                logger.info("Successfully processed message %s", message.id)
+            else:
+                message.retry_count += 1
+                failed_messages.append(message)
+                logger.warning(
+                    "Failed to send message %s, retry count: %s",
+                    message.id,
+                    message.retry_count,
+                )
+
+        self._save_results(sent_ids, failed_messages, held_ids)
+
+        return len(sent_ids), len(failed_messages)
+
+    def _send(self, messages):
+        """
+        Send messages through the producer, return one result per message
+        """
+        if not messages:
+            return []
+
+        logger.info("Sending %s messages", len(messages))
+        send_batch = getattr(self.producer, "send_batch", None)
+        if send_batch is None:
+            return send_each(self.producer, messages)
+
+        try:
+            results = send_batch(messages)
+        except Exception as e:
+            # The whole batch failed, every message counts an attempt
+            return [e] * len(messages)
+
+        if len(results) != len(messages):
+            # Results cannot be matched to messages, fail the whole batch so
+            # its leases are released and the messages retried
+            error = ValueError(
+                f"Producer returned {len(results)} results for {len(messages)} messages"
+            )
+            return [error] * len(messages)
+        return results
 
-            processed_count = 0
-            failed_count = 0
+    def _save_results(self, sent_ids, failed_messages, held_ids):
+        """
+        Persist batch outcome with one fenced UPDATE per outcome
 
-            for message in messages:
-                try:
-                    logger.info(
-                        "Processing message %s for topic '%s'",
-                        message.id,
-                        message.topic,
-                    )
+        Rows are only written while this worker still holds their lease, the
+        retry count is incremented in the database rather than copied from
+        the claimed rows. Failures are grouped by error message.
+        """
+        expected = len(sent_ids) + len(failed_messages) + len(held_ids)
+        written = 0
+
+        if sent_ids:
+            written += self.outbox.mark_sent(self.worker_id, sent_ids)
+
+        failures = {}
+        for message in failed_messages:
+            failures.setdefault(message.error_message, []).append(message.id)
+        for error_message, message_ids in failures.items():
+            written += self.outbox.mark_failed(
+                self.worker_id, message_ids, error_message
+            )
 
-                    success = self.producer.send_message(message.topic, message.payload)
-
-                    if success:
-                        message.sent = True
-                        message.sent_at = timezone.now()
-                        message.save()
-                        processed_count += 1
-                        logger.info("Successfully processed message %s", message.id)
-                    else:
-                        message.retry_count += 1
-                        message.last_retry_at = timezone.now()
-                        message.save()
-                        failed_count += 1
-                        logger.warning(
-                            "Failed to send message %s, retry count: %s",
-                            message.id,
-                            message.retry_count,
-                        )
+        if held_ids:
+            written += self.outbox.release_messages(self.worker_id, held_ids)
 
-                except Exception as e:
-                    logger.error("Error processing message %s: %s", message.id, e)
-                    message.retry_count += 1
-                    message.last_retry_at = timezone.now()
-                    message.error_message = str(e)
-                    message.save()
-                    failed_count += 1
-
-            return processed_count, failed_count
+        if written < expected:
+            logger.warning(
+                "Lost the lease of %s outbox messages, their results were not saved",
+                expected - written,
+            )
 
     def stop(self):
         """
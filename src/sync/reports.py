@@ -0,0 +1,51 @@
+import json
+
+from django.utils import timezone
+
+from src.core.circuit_breaker import get_circuit_breakers
+
+from .models import SyncSettings
+
+CIRCUIT_REPORT_PREFIX = "circuit_breakers:"
+
+
+def publish_report(key, data, description=""):
+    """
+    Store a JSON report of a background process for the web process
+
+    Reports live in SyncSettings next to the last sync date, so every
+    process reads them whatever cache backend is configured.
+    """
+    SyncSettings.objects.update_or_create(
+        key=key,
+        defaults={"value": json.dumps(data, default=str), "description": description},
+    )
+
+
+def get_report(key):
+    value = SyncSettings.objects.filter(key=key).values_list("value", flat=True).first()
+    return json.loads(value) if value else None
+
+
+def publish_circuit_breakers(process):
+    """
+    Publish the breaker states of this process under its role name
+    """
+    publish_report(
+        f"{CIRCUIT_REPORT_PREFIX}{process}",
+        {
+            "process": process,
+            "updated_at": timezone.now().isoformat(),
+            "circuits": [breaker.snapshot() for breaker in get_circuit_breakers()],
+        },
+        f"Circuit breakers of {process}",
+    )
+
+
+def get_circuit_breaker_reports():
+    values = (
+        SyncSettings.objects.filter(key__startswith=CIRCUIT_REPORT_PREFIX)
+        .order_by("key")
+        .values_list("value", flat=True)
+    )
+    return [json.loads(value) for value in values]
@@ -1,6 +1,9 @@
 import requests
 from django.utils import timezone
 
+from src.core.circuit_breaker import CircuitOpenError, get_circuit_breaker_for_url
+from src.events.cache import invalidate_events
+
 from .models import SyncResult, SyncSettings
 from .serializers import ExternalEventSerializer
 
@@ -15,10 +18,16 @@ class EventProvideClient:
             params["changed_at"] = changed_at.strftime("%Y-%m-%d")
 
         try:
-            response = requests.get(self.BASE_URL, params=params, timeout=30)
+            response = get_circuit_breaker_for_url(self.BASE_URL).call(
+                requests.get,
+                self.BASE_URL,
+                params=params,
+                timeout=30,
+                is_failure=lambda response: response.status_code >= 500,
+            )
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except (requests.RequestException, CircuitOpenError) as e:
             raise Exception(f"Failed to fetch events from provider: {str(e)}")
 
     def sync_events(self, changed_at=None):
@@ -28,12 +37,14 @@ class EventProvideClient:
         new_count = 0
         updated_count = 0
         errors = []
+        event_ids = []
 
         for event_data in events_data:
             try:
                 serializer = ExternalEventSerializer(data=event_data)
                 if serializer.is_valid():
                     event, created = serializer.create_or_update_event()
+                    event_ids.append(event.id)
                     if created:
                         new_count += 1
                     else:
@@ -47,7 +58,7 @@ class EventProvideClient:
                     f"Error proccessing event {event_data.get('id')}: {str(e)}"
                 )
 
-        return new_count, updated_count, errors
+        return new_count, updated_count, errors, event_ids
 
 
 class SyncService:
@@ -84,7 +95,10 @@ class SyncService:
 
         try:
             changed_at = None if full_sync else self.get_last_sync_date()
-            new_count, updated_count, errors = self.client.sync_events(changed_at)
+            new_count, updated_count, errors, event_ids = self.client.sync_events(
+                changed_at
+            )
+            invalidate_events(event_ids)
             sync_result.new_event_count = new_count
             sync_result.updated_events_count = updated_count
             sync_result.finished_at = timezone.now()
@@ -0,0 +1,367 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from src.core.circuit_breaker import get_circuit_breaker
+from src.events.notification_dispatcher import NotificationDispatcher
+
+from .models import OutboxMessage
+from .outbox_pool import OutboxWorkerPool
+from .outbox_services import NOTIFICATIONS_TOPIC, FakeBrokerProducer, OutboxService
+from .outbox_worker import OutboxWorker
+from .reports import publish_circuit_breakers
+
+STRESS_TOPIC = "outbox-stress"
+POOL_TOPIC = "outbox-pool-stress"
+
+
+class RecordingProducer:
+    """
+    Producer that takes `latency` seconds per message and records what it sent
+    """
+
+    def __init__(self, latency, delivered, lock):
+        self.latency = latency
+        self.delivered = delivered
+        self.lock = lock
+
+    def send_message(self, topic, payload):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.delivered[payload["message_id"]] += 1
+        return True
+
+
+class LoggingProducer:
+    """
+    Producer that appends every delivery to a per-process log file
+
+    It fails the first attempt of every `fail_every`-th message and the first
+    process to reach `crash_after` sends dies without cleaning up.
+    """
+
+    def __init__(self, log_dir, fail_every=0, crash_after=0):
+        self.log_dir = log_dir
+        self.fail_every = fail_every
+        self.crash_after = crash_after
+        self.sends = 0
+        self.failed = set()
+        self.log = None
+
+    def send_message(self, topic, payload):
+        if self.log is None:
+            path = os.path.join(self.log_dir, f"{os.getpid()}.log")
+            self.log = open(path, "a", buffering=1)
+
+        self.sends += 1
+        if self.crash_after and self.sends == self.crash_after and self._claim_crash():
+            os._exit(1)
+        time.sleep(0.001)
+        sequence = payload["sequence"]
+        if self.fail_every and sequence % self.fail_every == 0:
+            if sequence not in self.failed:
+                self.failed.add(sequence)
+                return False
+
+        self.log.write(f"{time.monotonic_ns()} {payload['event_id']} {sequence}\n")
+        return True
+
+    def _claim_crash(self):
+        try:
+            os.close(
+                os.open(os.path.join(self.log_dir, "crashed"), os.O_CREAT | os.O_EXCL)
+            )
+        except FileExistsError:
+            return False
+        return True
+
+
+class NotificationMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("monitor"))
+        self.url = "/sync/notifications/metrics/"
+
+    def test_unknown_without_dispatcher_report(self):
+        self.assertEqual(self.client.get(self.url).data["status"], "unknown")
+
+    def test_reports_published_metrics_and_queue_depth(self):
+        dispatcher = NotificationDispatcher(concurrency=1)
+        try:
+            dispatcher._record_batch(10, 9, 1, time.perf_counter())
+        finally:
+            dispatcher.close()
+        OutboxService().create_messages(
+            NOTIFICATIONS_TOPIC, [{"email": "ada@example.com"}]
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["status"], "reporting")
+        self.assertEqual(response.data["sent_total"], 9)
+        self.assertEqual(response.data["failed_total"], 1)
+        self.assertEqual(response.data["queue_depth"], 1)
+
+    def test_idle_polls_do_not_query_queue_depth(self):
+        dispatcher = NotificationDispatcher(concurrency=1)
+        try:
+            dispatcher._record_batch(0, 0, 0, time.perf_counter())
+            # Within the idle report interval nothing is written or counted
+            with self.assertNumQueries(0):
+                dispatcher._record_batch(0, 0, 0, time.perf_counter())
+        finally:
+            dispatcher.close()
+
+
+class CircuitBreakerViewTests(TestCase):
+    def test_reports_breakers_published_by_other_processes(self):
+        get_circuit_breaker("notifications.example.com")
+        publish_circuit_breakers("notification_dispatcher")
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("monitor"))
+
+        response = client.get("/sync/circuits/")
+
+        self.assertEqual(response.status_code, 200)
+        [report] = response.data["processes"]
+        self.assertEqual(report["process"], "notification_dispatcher")
+        self.assertIn(
+            "notifications.example.com",
+            [circuit["name"] for circuit in report["circuits"]],
+        )
+
+
+class OutboxLeaseTests(TestCase):
+    def test_results_are_only_written_by_the_lease_owner(self):
+        outbox = OutboxService()
+        outbox.create_messages(STRESS_TOPIC, [{"message_id": "1"}])
+        [message] = outbox.claim_messages("stale", 10, [STRESS_TOPIC], 30)
+        # The lease ran out and another worker claimed the message
+        OutboxMessage.objects.update(lease_until=None)
+        outbox.claim_messages("current", 10, [STRESS_TOPIC], 30)
+
+        self.assertEqual(outbox.mark_sent("stale", [message.id]), 0)
+        self.assertEqual(outbox.mark_failed("stale", [message.id], "boom"), 0)
+        self.assertEqual(outbox.release_messages("stale", [message.id]), 0)
+        message.refresh_from_db()
+        self.assertEqual((message.claimed_by, message.retry_count), ("current", 0))
+
+    def test_backoff_only_holds_back_the_same_topic(self):
+        outbox = OutboxService()
+        [failed] = outbox.create_messages(STRESS_TOPIC, [{"event_id": "1"}])
+        outbox.create_messages(POOL_TOPIC, [{"event_id": "1"}])
+        outbox.claim_messages("worker", 10, [STRESS_TOPIC], 30)
+        outbox.mark_failed("worker", [failed.id], "boom")
+
+        [claimed] = outbox.claim_messages("worker", 10, None, 30)
+
+        self.assertEqual(claimed.topic, POOL_TOPIC)
+
+
+class OutboxWorkerBatchTests(TestCase):
+    def setUp(self):
+        OutboxService().create_messages(
+            STRESS_TOPIC, [{"message_id": str(index)} for index in range(5)]
+        )
+
+    def test_batching_producer_sends_a_batch_in_one_call(self):
+        producer = FakeBrokerProducer(latency=0)
+        worker = OutboxWorker(producer=producer, batch_size=5, topics=[STRESS_TOPIC])
+
+        self.assertEqual(worker._process_batch(), (5, 0))
+        self.assertEqual(producer.calls, 1)
+        self.assertFalse(OutboxMessage.objects.filter(sent=False).exists())
+
+    def test_result_count_mismatch_fails_the_batch(self):
+        producer = mock.Mock(spec=["send_batch"])
+        producer.send_batch.return_value = [True]
+        worker = OutboxWorker(producer=producer, batch_size=5, topics=[STRESS_TOPIC])
+
+        self.assertEqual(worker._process_batch(), (0, 5))
+        for message in OutboxMessage.objects.all():
+            self.assertFalse(message.sent)
+            self.assertEqual(message.retry_count, 1)
+            self.assertIsNone(message.lease_until)
+            self.assertIn("1 results for 5 messages", message.error_message)
+
+
+class OutboxWorkerConcurrencyTests(TransactionTestCase):
+    """
+    Run several workers against one table in threads, each with its own
+    database connection, and check every message is delivered exactly once
+    """
+
+    def _run_workers(self, workers, messages, batch_size, latency, lease_seconds):
+        delivered = Counter()
+        lock = threading.Lock()
+        deadline = time.monotonic() + lease_seconds + 30
+
+        def work():
+            worker = OutboxWorker(
+                producer=RecordingProducer(latency, delivered, lock),
+                batch_size=batch_size,
+                topics=[STRESS_TOPIC],
+                lease_seconds=lease_seconds,
+            )
+            try:
+                while time.monotonic() < deadline:
+                    with lock:
+                        if len(delivered) >= messages:
+                            return
+                    if worker._process_batch() == (0, 0):
+                        # Wait for the crashed worker's lease to run out
+                        time.sleep(0.1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return delivered
+
+    def _queue(self, messages):
+        OutboxService().create_messages(
+            STRESS_TOPIC, [{"message_id": str(index)} for index in range(messages)]
+        )
+
+    def _assert_delivered_once(self, delivered, messages):
+        self.assertEqual(set(delivered), {str(index) for index in range(messages)})
+        self.assertEqual(max(delivered.values()), 1)
+        self.assertFalse(OutboxMessage.objects.filter(sent=False).exists())
+
+    def test_messages_of_a_crashed_worker_are_delivered_once(self):
+        self._queue(400)
+        # A worker that claims a batch and dies before sending it
+        crashed = OutboxService().claim_messages(
+            "crashed-worker", 50, [STRESS_TOPIC], 1
+        )
+
+        delivered = self._run_workers(
+            workers=4, messages=400, batch_size=50, latency=0.001, lease_seconds=1
+        )
+
+        self.assertEqual(len(crashed), 50)
+        self._assert_delivered_once(delivered, 400)
+
+    def test_slow_batches_keep_their_lease(self):
+        self._queue(60)
+
+        # A batch takes 1.5 s with a 1 s lease, only renewal keeps the idle
+        # third worker from claiming it again
+        delivered = self._run_workers(
+            workers=3, messages=60, batch_size=30, latency=0.05, lease_seconds=1
+        )
+
+        self._assert_delivered_once(delivered, 60)
+
+
+class OutboxWorkerPoolTests(TransactionTestCase):
+    """
+    Drain messages of several events with forked worker pools and check each
+    event is delivered completely and in order
+    """
+
+    messages = 300
+
+    def setUp(self):
+        events = [str(uuid.uuid4()) for _ in range(10)]
+        OutboxService().create_messages(
+            POOL_TOPIC,
+            [
+                {"event_id": events[index % len(events)], "sequence": index}
+                for index in range(self.messages)
+            ],
+        )
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.log_dir = log_dir.name
+
+    def _build_pool(self, workers, fail_every=0, crash_after=0):
+        return OutboxWorkerPool(
+            workers=workers,
+            producer_factory=lambda: LoggingProducer(
+                self.log_dir, fail_every, crash_after
+            ),
+            batch_size=20,
+            poll_interval=0.1,
+            topics=[POOL_TOPIC],
+            report_interval=3600,
+            restart_delay=0.1,
+            retry_backoff=0.1,
+        )
+
+    def _run(self, pools):
+        def watch():
+            # Counters only include persisted batches, so a crashed batch
+            # is waited for until its messages are sent again
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
+                if sum(sum(pool.sent_counters) for pool in pools) >= self.messages:
+                    break
+                time.sleep(0.05)
+            for pool in pools:
+                pool.stop()
+
+        threads = [threading.Thread(target=watch)]
+        threads += [threading.Thread(target=pool.run) for pool in pools]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _deliveries(self):
+        """
+        Sequences delivered per event in delivery order
+        """
+        records = []
+        for name in os.listdir(self.log_dir):
+            if name.endswith(".log"):
+                with open(os.path.join(self.log_dir, name)) as log:
+                    records += [line.split() for line in log]
+
+        deliveries = defaultdict(list)
+        for _, event_id, sequence in sorted(records, key=lambda r: int(r[0])):
+            deliveries[event_id].append(int(sequence))
+        return deliveries
+
+    def _assert_delivered_in_order(self):
+        delivered = set()
+        for event_id, sequences in self._deliveries().items():
+            last = -1
+            for sequence in sequences:
+                # A crashed batch is delivered again, only first sends count
+                if sequence in delivered:
+                    continue
+                delivered.add(sequence)
+                self.assertGreater(sequence, last, f"Event {event_id} out of order")
+                last = sequence
+
+        self.assertEqual(delivered, set(range(self.messages)))
+        self.assertFalse(OutboxMessage.objects.filter(sent=False).exists())
+
+    def test_events_stay_in_order_through_retries_and_a_crash(self):
+        pool = self._build_pool(4, fail_every=17, crash_after=30)
+
+        self._run([pool])
+
+        self._assert_delivered_in_order()
+        self.assertEqual(sum(pool.restarts), 1)
+
+    def test_second_pool_waits_for_partition_locks(self):
+        pools = [self._build_pool(3), self._build_pool(2)]
+
+        self._run(pools)
+
+        self._assert_delivered_in_order()
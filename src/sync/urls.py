@@ -7,4 +7,10 @@ app_name = "sync"
 urlpatterns = [
     path("outbox/stats/", views.outbox_stats, name="outbox-stats"),
     path("outbox/health/", views.outbox_health, name="outbox-health"),
+    path("circuits/", views.circuit_breakers, name="circuit-breakers"),
+    path(
+        "notifications/metrics/",
+        views.notification_metrics,
+        name="notification-metrics",
+    ),
 ]
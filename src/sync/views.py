@@ -1,7 +1,12 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .outbox_services import OutboxService
+from src.core.circuit_breaker import get_circuit_breakers
+from src.events.notification_dispatcher import METRICS_REPORT_KEY
+
+from .models import OutboxMessage
+from .outbox_services import MAX_RETRIES, NOTIFICATIONS_TOPIC, OutboxService
+from .reports import get_circuit_breaker_reports, get_report
 
 
 @api_view(["GET"])
@@ -30,3 +35,35 @@ def outbox_health(request):
     }
 
     return Response(health_status)
+
+
+@api_view(["GET"])
+def notification_metrics(request):
+    """
+    Throughput reported by the notification dispatcher and queue depth
+    """
+    metrics = get_report(METRICS_REPORT_KEY)
+
+    if metrics is None:
+        return Response({"status": "unknown", "message": "No dispatcher metrics"})
+
+    queue_depth = OutboxMessage.objects.filter(
+        topic=NOTIFICATIONS_TOPIC, sent=False, retry_count__lt=MAX_RETRIES
+    ).count()
+    return Response({"status": "reporting", **metrics, "queue_depth": queue_depth})
+
+
+@api_view(["GET"])
+def circuit_breakers(request):
+    """
+    State of outgoing HTTP circuit breakers
+
+    `circuits` are the breakers of this web process, `processes` the last
+    states published by the dispatcher and sync_events processes.
+    """
+    return Response(
+        {
+            "circuits": [breaker.snapshot() for breaker in get_circuit_breakers()],
+            "processes": get_circuit_breaker_reports(),
+        }
+    )
@@ -0,0 +1,8 @@
+"""
+Development tools: benchmarks and load tests that are not shipped with the
+service. The commands are only installed with the tools settings:
+
+    DJANGO_SETTINGS_MODULE=tools.settings python manage.py <command>
+
+Correctness checks live in the apps' tests.py.
+"""
@@ -0,0 +1,88 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/sec of event read endpoints under concurrent load. "
+        "Run the app under ASGI (e.g. uvicorn src.core.asgi:application) and "
+        "WSGI (e.g. gunicorn src.core.wsgi) and pass one URL per server, e.g. "
+        "http://localhost:8001/api/events/async/ and "
+        "http://localhost:8000/api/events/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Endpoint URLs to compare")
+        parser.add_argument(
+            "--token",
+            required=True,
+            help="Access token sent in the Authorization header",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Number of concurrent connections",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Total number of requests per URL",
+        )
+
+    def handle(self, *args, **options):
+        for url in options["urls"]:
+            self._run(url, options)
+
+    def _run(self, url, options):
+        concurrency = options["concurrency"]
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        remaining = [options["requests"]]
+        lock = threading.Lock()
+        latencies = []
+        errors = []
+
+        def worker():
+            session = requests.Session()
+            session.headers.update(headers)
+
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+
+                started = time.perf_counter()
+                try:
+                    response = session.get(url, timeout=30)
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - started
+
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+        total = time.perf_counter() - started
+
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{url}: all requests failed"))
+            return
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{url}: {len(latencies) / total:,.0f} req/s at {concurrency} "
+            f"connections, p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p99 {p99 * 1000:.1f} ms, errors {len(errors)}"
+        )
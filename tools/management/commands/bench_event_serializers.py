@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from src.events.models import Event, Place
+from src.events.projections import (
+    EVENT_DETAIL_FIELDS,
+    EVENT_LIST_FIELDS,
+    get_projection_queryset,
+    project_events,
+)
+from src.events.serializers import EventDetailSerializer, EventListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of serializer and projection event rendering"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=5000,
+            help="Number of events rendered per run",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of runs, the best one is reported",
+        )
+        parser.add_argument(
+            "--create",
+            type=int,
+            default=0,
+            help="Create this many temporary events (rolled back afterwards)",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["create"]:
+                self._create_events(options["create"])
+
+            queryset = Event.objects.order_by("event_date", "id")[: options["rows"]]
+            cases = [
+                ("list", EventListSerializer, EVENT_LIST_FIELDS),
+                ("detail", EventDetailSerializer, EVENT_DETAIL_FIELDS),
+            ]
+
+            for name, serializer_class, fields in cases:
+                self._compare(name, queryset, serializer_class, fields, options)
+
+            transaction.set_rollback(True)
+
+    def _compare(self, name, queryset, serializer_class, fields, options):
+        renderer = JSONRenderer()
+
+        def render_serializer():
+            events = queryset.select_related("place")
+            return renderer.render(serializer_class(events, many=True).data)
+
+        def render_projection():
+            rows = get_projection_queryset(queryset, fields)
+            return renderer.render(project_events(rows, fields))
+
+        serializer_body = render_serializer()
+        if serializer_body != render_projection():
+            raise CommandError(f"{name}: projection output differs from serializer")
+
+        rows = queryset.count()
+        serializer_rate = rows / self._measure(render_serializer, options["repeat"])
+        projection_rate = rows / self._measure(render_projection, options["repeat"])
+
+        self.stdout.write(
+            f"{name}: {rows} rows, serializer {serializer_rate:,.0f} rows/s, "
+            f"projection {projection_rate:,.0f} rows/s "
+            f"(x{projection_rate / serializer_rate:.1f})"
+        )
+
+    def _measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _create_events(self, count):
+        place = Place.objects.create(name="Benchmark place")
+        now = timezone.now()
+        Event.objects.bulk_create(
+            Event(
+                name=f"Benchmark event {i}",
+                event_date=now + timedelta(minutes=i),
+                place=place if i % 2 else None,
+            )
+            for i in range(count)
+        )
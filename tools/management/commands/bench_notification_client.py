@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from src.events.notification_client import NotificationClient
+from src.events.notification_service import NotificationService
+from tools.notification_stub import NotificationStubServer
+
+
+class UnpooledClient:
+    """
+    Previous behaviour: module-level requests.post, new connection per email
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def post(self, path, json, headers=None):
+        return requests.post(
+            f"{self.base_url}/{path}", json=json, headers=headers, timeout=10
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare emails/sec of per-request connections and the pooled "
+        "notification client against a local stub notification API"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--emails",
+            type=int,
+            default=2000,
+            help="Number of emails sent per client",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Number of sending threads",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Stub response latency in seconds",
+        )
+        parser.add_argument(
+            "--fail-first",
+            type=int,
+            default=0,
+            help="Number of first stub responses answered with 503",
+        )
+
+    def handle(self, *args, **options):
+        with NotificationStubServer(latency=options["latency"]) as stub:
+            clients = {
+                "requests.post": UnpooledClient(stub.base_url),
+                "pooled client": NotificationClient(
+                    stub.base_url,
+                    pool_size=options["concurrency"],
+                    backoff_factor=0,
+                ),
+            }
+
+            for name, client in clients.items():
+                stub.requests = stub.connections = 0
+                stub.fail_first = options["fail_first"]
+                sent, elapsed = self._run(client, options)
+                self.stdout.write(
+                    f"{name}: {sent / elapsed:,.0f} emails/s, "
+                    f"{sent}/{options['emails']} sent, "
+                    f"{stub.requests} requests over {stub.connections} connections"
+                )
+
+    def _run(self, client, options):
+        service = NotificationService(client=client)
+
+        def send(index):
+            return service.send_confirmation_email(
+                email=f"attendee{index}@example.com",
+                full_name=f"Attendee {index}",
+                confirmation_code="ABC123",
+                event_name="Benchmark",
+            )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            sent = sum(executor.map(send, range(options["emails"])))
+        return sent, time.perf_counter() - started
@@ -0,0 +1,88 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.sync.models import OutboxMessage
+from src.sync.outbox_services import FakeBrokerProducer, OutboxService
+from src.sync.outbox_worker import OutboxWorker
+
+BENCH_TOPIC = "outbox-producer-benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare messages/sec of OutboxWorker with per-message and batched "
+        "sends against a fake broker with configurable latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=1000,
+            help="Number of queued messages per run",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Messages claimed per worker batch",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.005,
+            help="Broker round trip in seconds",
+        )
+        parser.add_argument(
+            "--per-message-latency",
+            type=float,
+            default=0.0001,
+            help="Broker time per message in seconds",
+        )
+
+    def handle(self, *args, **options):
+        worker_logger = logging.getLogger("src.sync.outbox_worker")
+        level = worker_logger.level
+        # Per-message INFO logging would dominate the measurement
+        worker_logger.setLevel(logging.WARNING)
+
+        try:
+            for batching in (False, True):
+                self._run(batching, options)
+        finally:
+            worker_logger.setLevel(level)
+            OutboxMessage.objects.filter(topic=BENCH_TOPIC).delete()
+
+    def _run(self, batching, options):
+        OutboxService().create_messages(
+            BENCH_TOPIC,
+            [{"message_id": str(index)} for index in range(options["messages"])],
+        )
+        producer = FakeBrokerProducer(
+            latency=options["latency"],
+            per_message_latency=options["per_message_latency"],
+            batching=batching,
+        )
+        worker = OutboxWorker(
+            producer=producer,
+            batch_size=options["batch_size"],
+            topics=[BENCH_TOPIC],
+        )
+
+        sent = 0
+        started = time.perf_counter()
+        while True:
+            processed, failed = worker._process_batch()
+            if processed == 0 and failed == 0:
+                break
+            sent += processed
+        elapsed = time.perf_counter() - started
+
+        OutboxMessage.objects.filter(topic=BENCH_TOPIC).delete()
+        self.stdout.write(
+            f"{'send_batch' if batching else 'send_message':>12}: "
+            f"{sent / elapsed:,.0f} msg/s ({sent} sent in {elapsed:.2f} s, "
+            f"{producer.calls} broker calls)"
+        )
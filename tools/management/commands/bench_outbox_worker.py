@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.sync.models import OutboxMessage
+from src.sync.outbox_services import OutboxService
+from src.sync.outbox_worker import OutboxWorker
+
+BENCH_TOPIC = "outbox-benchmark"
+
+
+class NullProducer:
+    """
+    Producer that accepts every message instantly, so only the outbox
+    bookkeeping is measured
+    """
+
+    def __init__(self, fail_every=0):
+        self.fail_every = fail_every
+        self.sent = 0
+
+    def send_message(self, topic, payload):
+        self.sent += 1
+        return not (self.fail_every and self.sent % self.fail_every == 0)
+
+
+class Command(BaseCommand):
+    help = "Measure messages/sec of OutboxWorker batches of different sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-sizes",
+            default="100,1000,10000",
+            help="Comma separated batch sizes to measure",
+        )
+        parser.add_argument(
+            "--fail-every",
+            type=int,
+            default=10,
+            help="Fail every n-th send to exercise retry writes, 0 disables",
+        )
+
+    def handle(self, *args, **options):
+        worker_logger = logging.getLogger("src.sync.outbox_worker")
+        level = worker_logger.level
+        # Per-message INFO logging would dominate the measurement
+        worker_logger.setLevel(logging.WARNING)
+
+        try:
+            for batch_size in map(int, options["batch_sizes"].split(",")):
+                self._run(batch_size, options["fail_every"])
+        finally:
+            worker_logger.setLevel(level)
+            OutboxMessage.objects.filter(topic=BENCH_TOPIC).delete()
+
+    def _run(self, batch_size, fail_every):
+        OutboxService().create_messages(
+            BENCH_TOPIC,
+            [
+                {"message_id": str(index), "payload": "x" * 200}
+                for index in range(batch_size)
+            ],
+        )
+        worker = OutboxWorker(
+            producer=NullProducer(fail_every),
+            batch_size=batch_size,
+            topics=[BENCH_TOPIC],
+        )
+
+        started = time.perf_counter()
+        processed, failed = worker._process_batch()
+        elapsed = time.perf_counter() - started
+
+        OutboxMessage.objects.filter(topic=BENCH_TOPIC).delete()
+        self.stdout.write(
+            f"batch {batch_size:>6}: {(processed + failed) / elapsed:,.0f} msg/s "
+            f"({processed} sent, {failed} failed in {elapsed * 1000:.0f} ms)"
+        )
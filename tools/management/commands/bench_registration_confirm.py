@@ -0,0 +1,107 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from src.events.models import Event, EventRegistration
+from src.events.registration_services import RegistrationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure registration confirm latency while the registrations table "
+        "grows. Inserts synthetic registrations into a temporary event and "
+        "removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma separated registrations table sizes to measure at",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=200,
+            help="Single confirms measured per size",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Codes per measured batch confirm",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        service = RegistrationService()
+        event = Event.objects.create(
+            name="Confirm benchmark", event_date=timezone.now(), status="closed"
+        )
+
+        try:
+            inserted = 0
+            for size in sizes:
+                codes = []
+                while inserted < size:
+                    count = min(10000, size - inserted)
+                    codes = self._insert(event, inserted, count)
+                    inserted += count
+
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {EventRegistration._meta.db_table}")
+
+                # Codes of the last inserted rows, none of them confirmed yet
+                sample = random.sample(
+                    codes,
+                    min(len(codes), options["samples"] + options["batch_size"]),
+                )
+                single = self._measure_single(
+                    service, event, sample[: options["samples"]]
+                )
+                batch = self._measure_batch(
+                    service, event, sample[options["samples"] :]
+                )
+
+                self.stdout.write(
+                    f"{size:>10,} rows: confirm p50 {statistics.median(single):.2f} "
+                    f"ms, p95 {self._p95(single):.2f} ms; batch of "
+                    f"{options['batch_size']} {batch:.1f} ms"
+                )
+        finally:
+            event.delete()
+
+    def _insert(self, event, offset, count):
+        registrations = [
+            EventRegistration(
+                event=event,
+                full_name=f"Bench {offset + i}",
+                email=f"bench{offset + i}@example.com",
+                # Sequential codes, random ones would collide at this volume
+                confirmation_code=f"{offset + i:06X}",
+            )
+            for i in range(count)
+        ]
+        EventRegistration.objects.bulk_create(registrations, batch_size=2000)
+        return [registration.confirmation_code for registration in registrations]
+
+    def _measure_single(self, service, event, codes):
+        latencies = []
+        for code in codes:
+            started = time.perf_counter()
+            service.confirm(event.id, code)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+
+    def _measure_batch(self, service, event, codes):
+        started = time.perf_counter()
+        service.confirm_batch(event.id, codes)
+        return (time.perf_counter() - started) * 1000
+
+    def _p95(self, latencies):
+        latencies = sorted(latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
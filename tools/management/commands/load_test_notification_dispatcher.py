@@ -0,0 +1,143 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from src.events.models import Event
+from src.events.notification_client import NotificationClient
+from src.events.notification_dispatcher import NotificationDispatcher
+from src.events.notification_service import NotificationService
+from src.sync.models import OutboxMessage
+from src.sync.outbox_services import NOTIFICATIONS_TOPIC, OutboxService
+from tools.notification_stub import NotificationStubServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue confirmation emails and drain them with the notification "
+        "dispatcher against a local fake notification API with injected "
+        "latency. Reports emails/sec and checks per-recipient ordering."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--emails",
+            type=int,
+            default=1000,
+            help="Number of queued emails",
+        )
+        parser.add_argument(
+            "--recipients",
+            type=int,
+            default=500,
+            help="Number of distinct recipients the emails are spread over",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Fake API latency per call in seconds",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            action="append",
+            help="Dispatcher concurrency to measure (can be repeated)",
+        )
+        parser.add_argument(
+            "--bulk-size",
+            type=int,
+            default=0,
+            help="Emails per bulk call, 0 sends emails one by one",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Messages claimed per dispatcher batch",
+        )
+
+    def handle(self, *args, **options):
+        if options["emails"] < 1 or options["recipients"] < 1:
+            raise CommandError("--emails and --recipients must be positive")
+
+        # Only the notifications queued by this run are dispatched
+        if OutboxMessage.objects.filter(topic=NOTIFICATIONS_TOPIC, sent=False).exists():
+            raise CommandError("Notification queue is not empty, drain it first")
+
+        event = Event.objects.create(
+            name="Notification load test", event_date=timezone.now()
+        )
+        bulk_path = "api/notifications/bulk" if options["bulk_size"] else ""
+
+        try:
+            with override_settings(NOTIFICATION_BULK_PATH=bulk_path):
+                for concurrency in options["concurrency"] or [1, 10, 50]:
+                    self._run(event, concurrency, options)
+        finally:
+            event.delete()
+
+    def _run(self, event, concurrency, options):
+        messages = self._queue(event, options)
+
+        with NotificationStubServer(latency=options["latency"]) as stub:
+            client = NotificationClient(stub.base_url, pool_size=concurrency)
+            dispatcher = NotificationDispatcher(
+                notification_service=NotificationService(client=client),
+                batch_size=options["batch_size"],
+                concurrency=concurrency,
+                bulk_size=options["bulk_size"] or 1,
+            )
+
+            started = time.perf_counter()
+            try:
+                while dispatcher.dispatch_batch() != (0, 0):
+                    pass
+            finally:
+                dispatcher.close()
+                client.close()
+            elapsed = time.perf_counter() - started
+
+        OutboxMessage.objects.filter(id__in=[m.id for m in messages]).delete()
+
+        out_of_order = self._count_out_of_order(stub.received)
+        metrics = dispatcher.get_metrics()
+        self.stdout.write(
+            f"concurrency {concurrency}: {metrics['sent_total'] / elapsed:,.0f} "
+            f"emails/s, sent {metrics['sent_total']}/{len(messages)}, "
+            f"{stub.requests} API calls, out of order {out_of_order}"
+        )
+        if out_of_order:
+            raise CommandError("Per-recipient ordering violated")
+
+    def _queue(self, event, options):
+        """
+        Queue emails, each recipient gets codes in increasing order
+        """
+        payloads = []
+        for index in range(options["emails"]):
+            payloads.append(
+                {
+                    "registration_id": str(index),
+                    "event_id": str(event.id),
+                    "email": f"attendee{index % options['recipients']}@example.com",
+                    "full_name": f"Attendee {index}",
+                    "confirmation_code": f"{index:06d}",
+                    "action": "confirmation_email",
+                }
+            )
+        return OutboxService().create_messages(NOTIFICATIONS_TOPIC, payloads)
+
+    def _count_out_of_order(self, received):
+        last_code = defaultdict(str)
+        out_of_order = 0
+
+        for notification in received:
+            code = notification["message"].rsplit(":", 1)[1].strip()
+            if code < last_code[notification["to"]]:
+                out_of_order += 1
+            last_code[notification["to"]] = code
+
+        return out_of_order
@@ -0,0 +1,3 @@
+from src.core.settings import *  # noqa: F403
+
+INSTALLED_APPS = [*INSTALLED_APPS, "tools"]  # noqa: F405